@@ -3,20 +3,38 @@ Lambda 핸들러: 농산물 가격 분석 API
 - 자연어 질문 → 필터 추출 → 데이터 조회 → 요약/설명 생성
 - 가격 예측 API
 """
+import copy
+import itertools
 import json
-import uuid
+import threading
+import time
+import traceback
 import sys
 import os
 import boto3
-from io import StringIO
+from botocore.config import Config
+from functools import lru_cache
+from io import BytesIO
+
+# orjson(C 구현)이 있으면 직렬화 속도가 3-10배 빠름; 없으면 stdlib json 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Lambda 환경에서 src 모듈 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from pydantic import TypeAdapter
+
 from src.schema import (
     FilterRequest, APIResponse, SummaryStats, SeriesPoint,
     create_error_response, create_clarify_response
 )
+
+# 필터 검증기는 모듈 로드 시 한 번만 구성 (요청마다 재구성 방지)
+_FILTER_ADAPTER = TypeAdapter(FilterRequest)
+
 from src.nlu import parse as nlu_parse
 from src.query import execute_query
 from src.features import calculate_summary, enrich_summary_with_context
@@ -33,224 +51,364 @@ CORS_HEADERS = {
 }
 
 # S3 설정 (예측 데이터)
+# gzip 압축본(forecast_results.csv.gz)을 올려두면 전송 바이트가 크게 줄어듦
 FORECAST_BUCKET = 'agri-sagemaker-data-260893304786'
-FORECAST_KEY = 'forecasts/forecast_results.csv'
+FORECAST_KEY = os.environ.get('FORECAST_KEY', 'forecasts/forecast_results.csv')
 REGION = 'ap-southeast-2'
 
+# 커넥션 풀 확대 + keep-alive로 warm 호출 시 TLS 핸드셰이크 재발생 방지
+_BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 3},
+    connect_timeout=2,
+    read_timeout=30
+)
+
+# S3 클라이언트는 INIT 단계(부스트된 CPU)에서 미리 생성하여 매 호출마다
+# botocore 클라이언트 생성 비용(~수백 ms)을 내지 않도록 함
+try:
+    _S3_CLIENT = boto3.client('s3', region_name=REGION, config=_BOTO_CONFIG)
+except Exception as e:
+    print(f"S3 client init failed: {e}")
+    _S3_CLIENT = None
+
+# 요청 ID: uuid4(urandom 16바이트 + 포맷팅)보다 싼 단조 카운터 방식
+# 부팅 ms + PID가 컨테이너마다 다르므로 전역 유일성은 유지됨
+_BOOT = int(time.time() * 1000)
+_PID = os.getpid()
+_SEQ = itertools.count()
+
+
+def _new_request_id() -> str:
+    return f"{_BOOT:x}-{_PID:x}-{next(_SEQ):x}"
+
+
 # 예측 데이터 캐시
 _forecast_cache = None
 
+# 컨테이너 재기동 간에는 /tmp 파일 캐시로 S3 GetObject 생략
+_TMP_FORECAST_PATH = '/tmp/forecast_results.csv'
+
+
+class _NLUFallback(Exception):
+    """LLM 실패로 규칙 기반 결과가 나왔다는 신호 (캐시 저장 건너뜀)"""
+
+    def __init__(self, result, warnings):
+        self.result = result
+        self.warnings = warnings
+
+
+@lru_cache(maxsize=1024)
+def _cached_nlu(question_key: str, clarify_key: str):
+    """NLU 결과 캐시 본체 (해시 가능한 키만 받음)
+    - 일시적 Bedrock 오류로 내려간 규칙 기반 결과는 예외로 올려 메모이즈를 피함
+      (lru_cache는 예외를 저장하지 않으므로 다음 호출은 다시 LLM을 시도)"""
+    clarify_answers = json.loads(clarify_key) if clarify_key else None
+    result, warnings = nlu_parse(question_key, clarify_answers)
+    if any("규칙 기반 추출" in w for w in warnings):
+        raise _NLUFallback(result, warnings)
+    return result, warnings
+
+
+def cached_nlu_parse(question: str, clarify_answers=None):
+    """
+    nlu_parse의 LRU 캐시 래퍼
+    - 대시보드에서 같은 질문이 반복되면 Bedrock 호출 포함 파싱 전체를 생략
+    - 키: 공백 정규화된 질문 + 정렬 직렬화된 clarify_answers
+    """
+    question_key = " ".join(question.split())
+    clarify_key = json.dumps(clarify_answers, sort_keys=True, ensure_ascii=False) if clarify_answers else ""
+    try:
+        result, warnings = _cached_nlu(question_key, clarify_key)
+    except _NLUFallback as e:
+        result, warnings = e.result, e.warnings
+    # 하위 단계(예: query_high_avg_price)가 filters dict를 변형하므로 캐시 원본 보호
+    return copy.deepcopy(result), list(warnings)
+
 
 def load_forecast_data():
-    """S3에서 예측 데이터 로드"""
+    """S3에서 예측 데이터 로드 (DataFrame 캐싱)"""
     global _forecast_cache
 
     if _forecast_cache is not None:
         return _forecast_cache
 
     try:
-        s3 = boto3.client('s3', region_name=REGION)
+        import pandas as pd
+
+        s3 = _S3_CLIENT or boto3.client('s3', region_name=REGION)
+
+        # /tmp 캐시가 S3 객체보다 최신이면 GetObject 생략 (HEAD만 수행)
+        try:
+            head = s3.head_object(Bucket=FORECAST_BUCKET, Key=FORECAST_KEY)
+            remote_mtime = head['LastModified'].timestamp()
+            if os.path.exists(_TMP_FORECAST_PATH) and os.path.getmtime(_TMP_FORECAST_PATH) >= remote_mtime:
+                _forecast_cache = pd.read_csv(_TMP_FORECAST_PATH, encoding='utf-8-sig')
+                return _forecast_cache
+        except Exception:
+            pass
+
         response = s3.get_object(Bucket=FORECAST_BUCKET, Key=FORECAST_KEY)
-        csv_content = response['Body'].read().decode('utf-8-sig')
+        raw = response['Body'].read()
+
+        # gzip 매직 바이트 확인 후 투명하게 해제 (.csv/.csv.gz 모두 지원)
+        if raw[:2] == b'\x1f\x8b':
+            import gzip
+            raw = gzip.decompress(raw)
+
+        # pandas C 파서로 한 번에 파싱 (행 단위 Python 루프 제거)
+        _forecast_cache = pd.read_csv(BytesIO(raw), encoding='utf-8-sig')
+
+        # 다음 요청/재기동을 위해 해제된 원본을 /tmp에 기록 (실패해도 무시)
+        try:
+            with open(_TMP_FORECAST_PATH, 'wb') as f:
+                f.write(raw)
+        except OSError:
+            pass
 
-        # CSV 파싱
-        import csv
-        reader = csv.DictReader(StringIO(csv_content))
-        _forecast_cache = list(reader)
         return _forecast_cache
     except Exception as e:
         print(f"Forecast data load error: {e}")
-        return []
+        return None
 
 
 def get_forecast_summary():
-    """품목별 예측 요약"""
-    data = load_forecast_data()
-    if not data:
+    """품목별 예측 요약 (열 단위 벡터 연산, JSON 경계에서만 스칼라 변환)"""
+    df = load_forecast_data()
+    if df is None or len(df) == 0:
         return []
 
-    # 품목별 그룹화
-    items = {}
-    for row in data:
-        item_name = row['item_name']
-        if item_name not in items:
-            items[item_name] = {
-                'item_name': item_name,
-                'last_actual_price': float(row['last_actual_price']),
-                'forecasts': []
-            }
-        items[item_name]['forecasts'].append({
-            'date': row['forecast_date'],
-            'price': float(row['predicted_price'])
-        })
+    import numpy as np
 
-    # 요약 생성
-    result = []
-    for item_name, item_data in items.items():
-        forecasts = item_data['forecasts']
-        last_price = item_data['last_actual_price']
-        final_price = forecasts[-1]['price'] if forecasts else last_price
+    # 품목별 기준가/최종 예측가를 한 번의 groupby 집계로 추출
+    grouped = df.groupby('item_name', sort=False)
+    last_prices = grouped['last_actual_price'].first().to_numpy(dtype=np.float32)
+    final_prices = grouped['predicted_price'].last().to_numpy(dtype=np.float32)
 
-        change_pct = ((final_price - last_price) / last_price * 100) if last_price > 0 else 0
+    # 변화율은 전 품목에 대해 벡터로 계산 (0 나눗셈 방지)
+    safe_last = np.where(last_prices > 0, last_prices, 1)
+    change_pct = np.where(
+        last_prices > 0,
+        np.round((final_prices - last_prices) / safe_last * 100, 1),
+        0.0
+    )
+
+    result = []
+    for i, (item_name, g) in enumerate(grouped):
+        forecasts = [
+            {'date': d, 'price': float(p)}
+            for d, p in zip(g['forecast_date'].tolist(), g['predicted_price'].tolist())
+        ]
 
         result.append({
             'item_name': item_name,
-            'last_actual_price': last_price,
-            'predicted_price_3m': final_price,
-            'change_pct': round(change_pct, 1),
+            'last_actual_price': float(last_prices[i]),
+            'predicted_price_3m': float(final_prices[i]),
+            'change_pct': float(change_pct[i]),
             'forecasts': forecasts
         })
 
     return result
 
 
+def _dumps(body: dict) -> str:
+    """응답 본문 직렬화 (orjson 사용 가능 시 우선)"""
+    if orjson is not None:
+        # OPT_SERIALIZE_NUMPY: 이상치 항목의 np.float64가 문자열이 아닌 숫자로 직렬화됨
+        # (default=str는 날짜 등 그 외 타입용)
+        return orjson.dumps(body, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(body, ensure_ascii=False, default=str)
+
+
+def _loads(raw: str):
+    """요청 본문 파싱 (orjson 사용 가능 시 우선)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# 가장 흔한 200 응답의 골격은 미리 구성 (요청마다 dict 병합 방지)
+_RESP_200 = {"statusCode": 200, "headers": CORS_HEADERS}
+
+
 def create_response(status_code: int, body: dict) -> dict:
     """API Gateway 응답 형식 생성"""
+    if status_code == 200:
+        return {**_RESP_200, "body": _dumps(body)}
     return {
         "statusCode": status_code,
         "headers": CORS_HEADERS,
-        "body": json.dumps(body, ensure_ascii=False, default=str)
+        "body": _dumps(body)
     }
 
 
-def handler(event, context):
-    """
-    Lambda 메인 핸들러
+def _cors_endpoint(event, request_id):
+    """CORS preflight 응답"""
+    return create_response(200, {"message": "OK"})
 
-    엔드포인트:
-    - POST /api/query: 자연어 질문 처리
-    - GET /api/forecast: 가격 예측 데이터
+
+def _forecast_endpoint(event, request_id):
+    """GET /api/forecast: 가격 예측 데이터"""
+    forecasts = get_forecast_summary()
+    return create_response(200, {
+        "type": "forecast",
+        "data": forecasts,
+        "request_id": request_id
+    })
+
+
+def _query_endpoint(event, request_id):
+    """
+    POST /api/query: 자연어 질문 처리
 
     입력 형태:
     A) {"question": "..."} - 자연어
     B) {"filters": {...}} - 필터 직접 지정
     C) {"question": "...", "clarify_answers": {...}} - Clarification 답변
     """
-    request_id = str(uuid.uuid4())
-
-    try:
-        # HTTP 메서드 및 경로 확인
-        http_method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method", "")
-        path = event.get("path") or event.get("rawPath") or ""
+    # 요청 본문 파싱
+    body = event.get("body", "{}")
+    if isinstance(body, str):
+        body = _loads(body)
+
+    question = body.get("question")
+    filters_input = body.get("filters")
+    clarify_answers = body.get("clarify_answers")
+
+    warnings = []
+
+    # ============================================================
+    # 1. 필터 추출/검증
+    # ============================================================
+
+    if filters_input:
+        # B) 필터 직접 지정
+        try:
+            filters = _FILTER_ADAPTER.validate_python(filters_input).model_dump()
+        except Exception as e:
+            return create_response(400, create_error_response(
+                "INVALID_FILTERS",
+                f"필터 스키마 오류: {str(e)}",
+                request_id
+            ))
 
-        # OPTIONS 요청 처리 (CORS preflight)
-        if http_method == "OPTIONS":
-            return create_response(200, {"message": "OK"})
+    elif question:
+        # A) 또는 C) 자연어 질문
+        nlu_result, nlu_warnings = cached_nlu_parse(question, clarify_answers)
+        warnings.extend(nlu_warnings)
 
-        # 예측 API 처리
-        if "/forecast" in path and http_method == "GET":
-            forecasts = get_forecast_summary()
+        if nlu_result.get("type") == "clarify":
+            # Clarification 필요
             return create_response(200, {
-                "type": "forecast",
-                "data": forecasts,
+                "type": "clarify",
+                "filters": None,
+                "series": [],
+                "summary": None,
+                "narrative": "",
+                "warnings": ["질문이 애매하여 확인이 필요합니다."] + warnings,
+                "clarification": {
+                    "draft_filters": nlu_result.get("draft_filters", {}),
+                    "questions": nlu_result.get("questions", [])
+                },
                 "request_id": request_id
             })
 
-        # 요청 본문 파싱
-        body = event.get("body", "{}")
-        if isinstance(body, str):
-            body = json.loads(body)
-
-        question = body.get("question")
-        filters_input = body.get("filters")
-        clarify_answers = body.get("clarify_answers")
-
-        warnings = []
-
-        # ============================================================
-        # 1. 필터 추출/검증
-        # ============================================================
-
-        if filters_input:
-            # B) 필터 직접 지정
-            try:
-                filter_obj = FilterRequest(**filters_input)
-                filters = filter_obj.model_dump()
-            except Exception as e:
-                return create_response(400, create_error_response(
-                    "INVALID_FILTERS",
-                    f"필터 스키마 오류: {str(e)}",
-                    request_id
-                ))
-
-        elif question:
-            # A) 또는 C) 자연어 질문
-            nlu_result, nlu_warnings = nlu_parse(question, clarify_answers)
-            warnings.extend(nlu_warnings)
-
-            if nlu_result.get("type") == "clarify":
-                # Clarification 필요
-                return create_response(200, {
-                    "type": "clarify",
-                    "filters": None,
-                    "series": [],
-                    "summary": None,
-                    "narrative": "",
-                    "warnings": ["질문이 애매하여 확인이 필요합니다."] + warnings,
-                    "clarification": {
-                        "draft_filters": nlu_result.get("draft_filters", {}),
-                        "questions": nlu_result.get("questions", [])
-                    },
-                    "request_id": request_id
-                })
-
-            filters = nlu_result.get("filters", {})
-
-        else:
-            return create_response(400, create_error_response(
-                "MISSING_INPUT",
-                "question 또는 filters가 필요합니다.",
-                request_id
-            ))
+        filters = nlu_result.get("filters", {})
 
-        # ============================================================
-        # 2. 데이터 조회/집계
-        # ============================================================
+    else:
+        return create_response(400, create_error_response(
+            "MISSING_INPUT",
+            "question 또는 filters가 필요합니다.",
+            request_id
+        ))
 
-        series, query_warnings = execute_query(filters)
-        warnings.extend(query_warnings)
+    # ============================================================
+    # 2. 데이터 조회/집계
+    # ============================================================
 
-        if not series:
-            return create_response(404, create_error_response(
-                "NO_DATA",
-                "조건에 맞는 데이터가 없습니다.",
-                request_id
-            ))
+    series, query_warnings = execute_query(filters)
+    warnings.extend(query_warnings)
+
+    if not series:
+        return create_response(404, create_error_response(
+            "NO_DATA",
+            "조건에 맞는 데이터가 없습니다.",
+            request_id
+        ))
+
+    # ============================================================
+    # 3. 요약 통계 계산
+    # ============================================================
+
+    summary = calculate_summary(series, filters)
+    summary = enrich_summary_with_context(summary, filters, series)
+
+    # ============================================================
+    # 4. 내러티브 생성 (옵션)
+    # ============================================================
+
+    narrative = ""
+    if filters.get("explain", True):
+        narrative = generate_narrative(filters, series, summary, use_llm=False)
+
+    # ============================================================
+    # 5. 최종 응답 구성
+    # ============================================================
+
+    response_body = {
+        "type": "result",
+        "filters": filters,
+        "series": series,
+        "summary": summary,
+        "narrative": narrative,
+        "warnings": warnings,
+        "clarification": None,
+        "request_id": request_id
+    }
+
+    return create_response(200, response_body)
 
-        # ============================================================
-        # 3. 요약 통계 계산
-        # ============================================================
 
-        summary = calculate_summary(series, filters)
-        summary = enrich_summary_with_context(summary, filters, series)
+# (method, path) -> endpoint 정적 디스패치 테이블
+_ROUTES = {
+    ("OPTIONS", None): _cors_endpoint,
+    ("GET", "/api/forecast"): _forecast_endpoint,
+    ("GET", "/prod/api/forecast"): _forecast_endpoint,
+    ("POST", "/api/query"): _query_endpoint,
+    ("POST", "/prod/api/query"): _query_endpoint,
+}
+
+
+def handler(event, context):
+    """
+    Lambda 메인 핸들러
 
-        # ============================================================
-        # 4. 내러티브 생성 (옵션)
-        # ============================================================
+    엔드포인트:
+    - POST /api/query: 자연어 질문 처리
+    - GET /api/forecast: 가격 예측 데이터
+    """
+    request_id = _new_request_id()
 
-        narrative = ""
-        if filters.get("explain", True):
-            narrative = generate_narrative(filters, series, summary, use_llm=False)
+    try:
+        # HTTP 메서드 및 경로 확인
+        http_method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method", "")
+        path = event.get("path") or event.get("rawPath") or ""
 
-        # ============================================================
-        # 5. 최종 응답 구성
-        # ============================================================
+        # 정확 일치 디스패치 (일반 경로는 O(1) 조회)
+        key = ("OPTIONS", None) if http_method == "OPTIONS" else (http_method, path)
+        route = _ROUTES.get(key)
 
-        response_body = {
-            "type": "result",
-            "filters": filters,
-            "series": series,
-            "summary": summary,
-            "narrative": narrative,
-            "warnings": warnings,
-            "clarification": None,
-            "request_id": request_id
-        }
+        if route is None:
+            # 스테이지 프리픽스 등 변형 경로는 기존 부분 일치 규칙으로 처리
+            if "/forecast" in path and http_method == "GET":
+                route = _forecast_endpoint
+            else:
+                route = _query_endpoint
 
-        return create_response(200, response_body)
+        return route(event, request_id)
 
     except Exception as e:
-        import traceback
         error_detail = traceback.format_exc()
         print(f"Error: {error_detail}")
 
@@ -262,9 +420,38 @@ def handler(event, context):
 
 
 
-try:
+def _warmup():
+    """
+    INIT 단계(부스트된 CPU)에서 지연 초기화 상태를 미리 실체화
+    - pydantic 검증기/스키마 컴파일
+    - 데이터 캐시 및 날짜 범위 캐시
+    첫 핸들러 호출이 초기화 비용을 내지 않도록 함
+    """
+    # 무거운 C 확장은 INIT 단계에서 명시적으로 로드
+    # (핸들러 내부의 지연 import가 첫 요청에서 발화하지 않도록)
+    import pandas  # noqa: F401
+    import numpy  # noqa: F401
+
+    # get_dim_dict는 load_data 결과에 의존하므로 순차 실행하고,
+    # 독립적인 S3 예측 데이터 다운로드만 스레드로 겹쳐서 INIT 시간을 줄임
+    prefetch = threading.Thread(target=load_forecast_data, daemon=True)
+    prefetch.start()
+
     load_data()
     get_dim_dict()
+
+    # pydantic core 스키마 컴파일 및 TypeAdapter 경로 프라임
+    FilterRequest.model_json_schema()
+    _FILTER_ADAPTER.validate_python({"item_name": "감자"})
+
+    # 날짜 범위 계산 경로 프라임
+    from src.data_loader import get_data_date_range, get_default_date_range
+    get_data_date_range()
+    get_default_date_range()
+
+
+try:
+    _warmup()
     print("Data preloaded successfully")
 except Exception as e:
     print(f"Data preload failed: {e}")
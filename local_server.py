@@ -4,10 +4,18 @@ Local Development Server
 - Lambda 함수와 동일한 로직 사용
 - 프론트엔드 정적 파일 서빙
 """
+import asyncio
+import copy
+import csv
+import hashlib
 import os
 import sys
 import json
+import logging
+import traceback
 import uuid
+from collections import OrderedDict
+from functools import cache, lru_cache
 from pathlib import Path
 
 # 프로젝트 루트 추가
@@ -20,6 +28,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
+# orjson이 있으면 UTF-8 바이트를 직접 내보내는 ORJSONResponse 사용
+# (한글 narrative/warnings 직렬화가 stdlib json보다 수 배 빠름)
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+    _DefaultResponse = JSONResponse
+
 # 환경변수 설정
 os.environ.setdefault("DATA_PATH", str(Path(__file__).parent / "data" / "sample_agri_prices.csv"))
 os.environ.setdefault("USE_LOCAL", "true")
@@ -27,16 +43,29 @@ os.environ.setdefault("USE_LOCAL", "true")
 # 모듈 임포트
 from src.nlu import parse as nlu_parse
 from src.query import execute_query
-from src.features import calculate_summary, enrich_summary_with_context
+from src.features import calculate_summary, compute_trend_direction, enrich_summary_with_context
 from src.narrative import generate_narrative
 from src.schema import FilterRequest
+from pydantic import TypeAdapter
+
+# 필터 검증기는 모듈 로드 시 한 번만 구성 (요청마다 재구성 방지)
+_FILTER_ADAPTER = TypeAdapter(FilterRequest)
 from src.data_loader import load_data, get_dim_dict
 
+# 차원 목록은 워커당 한 번만 계산 (매 /api/dimensions 요청마다 재계산 방지)
+_dim_cached = cache(get_dim_dict)
+
+logger = logging.getLogger("local_server")
+
+# DEBUG=true면 에러 응답 본문에도 전체 트레이스백 포함 (개발용)
+_DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true")
+
 # FastAPI 앱
 app = FastAPI(
     title="Agricultural Price Chatbot API",
     description="농산물 가격 분석 챗봇 로컬 서버",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_DefaultResponse
 )
 
 # CORS 설정
@@ -59,6 +88,59 @@ class QueryRequest(BaseModel):
     clarify_answers: Optional[Dict[str, str]] = None
 
 
+# 동일 payload 재질의(예시 버튼 반복 클릭 등)는 NLU/쿼리/내러티브 파이프라인을
+# 통째로 건너뛰고 캐시된 응답을 재사용 (request_id만 새로 발급)
+_RESULT_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+_RESULT_CACHE_MAX = 128
+
+
+class _NLUFallback(Exception):
+    """LLM 실패로 규칙 기반 결과가 나왔다는 신호 (캐시 저장 건너뜀)"""
+
+    def __init__(self, result, warnings):
+        self.result = result
+        self.warnings = warnings
+
+
+@lru_cache(maxsize=1024)
+def _cached_nlu(question_key: str, clarify_key: str):
+    """NLU 결과 캐시 본체 (해시 가능한 키만 받음)
+    - 일시적 Bedrock 오류로 내려간 규칙 기반 결과는 예외로 올려 메모이즈를 피함
+      (lru_cache는 예외를 저장하지 않으므로 다음 호출은 다시 LLM을 시도)"""
+    clarify_answers = json.loads(clarify_key) if clarify_key else None
+    result, warnings = nlu_parse(question_key, clarify_answers)
+    if any("규칙 기반 추출" in w for w in warnings):
+        raise _NLUFallback(result, warnings)
+    return result, warnings
+
+
+def cached_nlu_parse(question: str, clarify_answers=None):
+    """
+    nlu_parse의 LRU 캐시 래퍼 (Lambda 핸들러와 동일 패턴)
+    - 같은 질문이 표현만 조금 다른 공백으로 반복돼도 Bedrock 호출 포함
+      파싱 전체를 생략
+    - 키: 공백 정규화된 질문 + 정렬 직렬화된 clarify_answers
+    """
+    question_key = " ".join(question.split())
+    clarify_key = json.dumps(clarify_answers, sort_keys=True, ensure_ascii=False) if clarify_answers else ""
+    try:
+        result, warnings = _cached_nlu(question_key, clarify_key)
+    except _NLUFallback as e:
+        result, warnings = e.result, e.warnings
+    # 하위 단계(예: query_high_avg_price)가 filters dict를 변형하므로 캐시 원본 보호
+    return copy.deepcopy(result), list(warnings)
+
+
+def _payload_cache_key(request: "QueryRequest") -> str:
+    payload = {
+        "question": request.question,
+        "filters": request.filters,
+        "clarify_answers": request.clarify_answers
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
 # ============================================================
 # API 엔드포인트
 # ============================================================
@@ -72,12 +154,17 @@ async def query(request: QueryRequest):
     request_id = str(uuid.uuid4())
     warnings = []
 
+    cache_key = _payload_cache_key(request)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        _RESULT_CACHE.move_to_end(cache_key)
+        return {**cached, "request_id": request_id}
+
     try:
         # 필터 직접 지정
         if request.filters:
             try:
-                filter_obj = FilterRequest(**request.filters)
-                filters = filter_obj.model_dump()
+                filters = _FILTER_ADAPTER.validate_python(request.filters).model_dump()
             except Exception as e:
                 return JSONResponse(
                     status_code=400,
@@ -86,7 +173,7 @@ async def query(request: QueryRequest):
 
         # 자연어 질문
         elif request.question:
-            nlu_result, nlu_warnings = nlu_parse(request.question, request.clarify_answers)
+            nlu_result, nlu_warnings = cached_nlu_parse(request.question, request.clarify_answers)
             warnings.extend(nlu_warnings)
 
             if nlu_result.get("type") == "clarify":
@@ -124,18 +211,33 @@ async def query(request: QueryRequest):
 
         # 요약 계산
         summary = calculate_summary(series, filters)
-        summary = enrich_summary_with_context(summary, filters, series)
 
-        # 내러티브 생성
+        # 내러티브 생성: 이상치 탐지와는 독립이므로 워커 스레드에서 동시에 실행.
+        # 단 trend_direction은 WoW/MoM 중 하나라도 없으면 추세 문구에 쓰이므로
+        # (짧은 구간에서 흔함) O(1)로 먼저 계산해 내러티브에도 반영되게 한다.
+        trend = compute_trend_direction(series)
+        if trend is not None:
+            summary["trend_direction"] = trend
         narrative = ""
         if filters.get("explain", True):
-            try:
-                narrative = generate_narrative(filters, series, summary)
-            except Exception as e:
-                warnings.append(f"내러티브 생성 실패: {str(e)}")
+            enriched, narrative_result = await asyncio.gather(
+                asyncio.to_thread(enrich_summary_with_context, summary, filters, series),
+                asyncio.to_thread(generate_narrative, filters, series, summary),
+                return_exceptions=True
+            )
+            if isinstance(enriched, BaseException):
+                raise enriched
+            summary = enriched
+
+            if isinstance(narrative_result, BaseException):
+                warnings.append(f"내러티브 생성 실패: {str(narrative_result)}")
                 narrative = f"{filters.get('item_name', '품목')} 분석이 완료되었습니다."
+            else:
+                narrative = narrative_result
+        else:
+            summary = enrich_summary_with_context(summary, filters, series)
 
-        return {
+        response = {
             "type": "result",
             "filters": filters,
             "series": series,
@@ -146,12 +248,19 @@ async def query(request: QueryRequest):
             "request_id": request_id
         }
 
+        _RESULT_CACHE[cache_key] = response
+        if len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+            _RESULT_CACHE.popitem(last=False)
+
+        return response
+
     except Exception as e:
-        import traceback
-        print(f"Error: {traceback.format_exc()}")
+        # 트레이스백은 로그 싱크로 한 번만 포매팅, 클라이언트엔 짧은 메시지만
+        logger.exception("쿼리 처리 실패")
+        message = traceback.format_exc() if _DEBUG else str(e)
         return JSONResponse(
             status_code=500,
-            content={"error": {"code": "INTERNAL_ERROR", "message": str(e)}}
+            content={"error": {"code": "INTERNAL_ERROR", "message": message}}
         )
 
 
@@ -164,9 +273,6 @@ async def health():
 @app.get("/api/forecast")
 async def forecast():
     """가격 예측 데이터 조회"""
-    import csv
-    from io import StringIO
-
     request_id = str(uuid.uuid4())
 
     try:
@@ -223,11 +329,11 @@ async def forecast():
         }
 
     except Exception as e:
-        import traceback
-        print(f"Forecast Error: {traceback.format_exc()}")
+        logger.exception("예측 데이터 조회 실패")
+        message = traceback.format_exc() if _DEBUG else str(e)
         return JSONResponse(
             status_code=500,
-            content={"error": {"code": "INTERNAL_ERROR", "message": str(e)}}
+            content={"error": {"code": "INTERNAL_ERROR", "message": message}}
         )
 
 
@@ -235,7 +341,7 @@ async def forecast():
 async def dimensions():
     """품목/품종/시장 목록"""
     try:
-        dim_dict = get_dim_dict()
+        dim_dict = _dim_cached()
         return dim_dict
     except Exception as e:
         return JSONResponse(
@@ -298,9 +404,17 @@ if __name__ == "__main__":
     print("  http://localhost:8000/api/query")
     print()
 
+    # DEV=1일 때만 파일 감시 리로드/액세스 로그 사용 (둘 다 처리량을 깎아먹음)
+    # loop/http="auto"는 uvloop/httptools가 설치돼 있으면 자동 선택
+    dev_mode = bool(os.getenv("DEV"))
+
     uvicorn.run(
         "local_server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=dev_mode,
+        loop="auto",
+        http="auto",
+        workers=1 if dev_mode else int(os.getenv("WORKERS", "1")),
+        access_log=dev_mode
     )
@@ -0,0 +1,161 @@
+"""
+예측 스크립트 공용 전처리/특성 헬퍼
+- 순(旬) 문자열 파싱, CSV/Parquet 로딩, 롤링 통계, 예측 특성 구성
+- local_forecast.py / sagemaker_setup.py 가 공유 (중복 정의 제거)
+"""
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'sample_agri_prices.csv')
+CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'agri_preprocessed.parquet')
+
+# 두 스크립트가 같은 캐시를 공유하므로 필요한 컬럼의 상위집합으로 매핑
+COLUMN_MAPPING = {
+    "시점": "period_raw",
+    "시장명": "market_name",
+    "품목명": "item_name",
+    "품종명": "variety_name",
+    "총반입량(kg)": "volume_kg",
+    "평균가(원/kg)": "price_kg",
+}
+
+
+def read_price_csv(path=DATA_PATH):
+    """원본 CSV 로드: pyarrow 엔진(멀티스레드 C++ 파서)이 설치돼 있으면 사용"""
+    try:
+        return pd.read_csv(path, encoding='utf-8-sig', engine='pyarrow')
+    except (ImportError, ValueError):
+        return pd.read_csv(path, encoding='utf-8-sig')
+
+
+def load_preprocessed():
+    """
+    전처리된 프레임 로드
+    - 원본 CSV보다 최신인 Parquet 캐시가 있으면 파싱/리네이밍/필터링 생략
+    - pyarrow가 없으면 조용히 CSV 경로로 동작
+    """
+    try:
+        if (os.path.exists(CACHE_PATH)
+                and os.path.getmtime(CACHE_PATH) >= os.path.getmtime(DATA_PATH)):
+            return pd.read_parquet(CACHE_PATH)
+    except (ImportError, OSError, ValueError):
+        pass
+
+    df = read_price_csv(DATA_PATH)
+    df = df.rename(columns=COLUMN_MAPPING)
+    df = df[df['market_name'] == '*전국도매시장']
+
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        df.to_parquet(CACHE_PATH)
+    except (ImportError, OSError, ValueError):
+        pass
+
+    return df
+
+
+@lru_cache(maxsize=None)
+def parse_period(period_str):
+    """'201801상순' -> datetime 변환 (단일 값; 고유 문자열이 연 36개뿐이라 메모이즈)"""
+    year = int(period_str[:4])
+    month = int(period_str[4:6])
+    if '상순' in period_str:
+        day = 5
+    elif '중순' in period_str:
+        day = 15
+    else:
+        day = 25
+    return datetime(year, month, day)
+
+
+def parse_period_column(period_raw):
+    """
+    '201801상순' 형식 시리즈 전체를 datetime으로 변환
+    - 고유값만 파싱한 뒤 map으로 브로드캐스트 (파싱 비용이 O(행 수) -> O(고유값 수))
+    """
+    mapping = {u: parse_period(u) for u in period_raw.unique()}
+    return period_raw.map(mapping)
+
+
+def rolling_stats(prices):
+    """
+    ma_3/ma_6/ma_12/std_6을 누적합 한 번으로 계산
+    - 창마다 데이터를 재스캔하는 rolling 4회 호출을 단일 패스로 융합
+    - std는 pandas rolling().std()와 같은 표본 표준편차(ddof=1)
+    """
+    x = prices.astype(np.float64)
+    n = len(x)
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    csum2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+    def win_mean(w):
+        out = np.full(n, np.nan)
+        if n >= w:
+            out[w - 1:] = (csum[w:] - csum[:-w]) / w
+        return out
+
+    std_6 = np.full(n, np.nan)
+    if n >= 6:
+        s = csum[6:] - csum[:-6]
+        s2 = csum2[6:] - csum2[:-6]
+        var = (s2 - s * s / 6) / 5
+        std_6[5:] = np.sqrt(np.maximum(var, 0))
+
+    return win_mean(3), win_mean(6), win_mean(12), std_6
+
+
+def create_features(df):
+    """
+    학습용 시계열 특성 생성 (단일 품목 집계 프레임 대상)
+    - 전제: 호출자가 date 컬럼을 만들고 날짜순으로 정렬해 둔 프레임
+      (전체 프레임을 한 번만 정렬하고 품목별 재정렬을 생략하기 위함)
+    - 호출자가 품목별로 새로 만든 집계 프레임을 넘기므로 방어적 복사 불필요
+    """
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['day_of_year'] = df['date'].dt.dayofyear
+    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
+    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+
+    for lag in [1, 2, 3, 6, 9, 12]:
+        df[f'lag_{lag}'] = df['price_kg'].shift(lag)
+
+    ma_3, ma_6, ma_12, std_6 = rolling_stats(df['price_kg'].to_numpy())
+    df['ma_3'] = ma_3
+    df['ma_6'] = ma_6
+    df['ma_12'] = ma_12
+    df['std_6'] = std_6
+
+    return df
+
+
+def fill_future_row(feat, ph, cur, future_date, s3, s6, s12, q6):
+    """
+    예측용 특성 1행을 사전 할당된 버퍼에 직접 기록
+    - ph: 실적+예측가를 담는 고정 길이 float32 배열, cur: 다음 기록 위치
+    - s3/s6/s12/q6: 최근 3/6/12순 합과 6순 제곱합 (호출자가 스텝마다 O(1) 갱신)
+    - 전제: cur >= 12 (호출자가 최소 20개 실적을 보장)
+    """
+    month = future_date.month
+
+    feat[0, 0] = future_date.year
+    feat[0, 1] = month
+    feat[0, 2] = future_date.dayofyear
+    feat[0, 3] = np.sin(2 * np.pi * month / 12)
+    feat[0, 4] = np.cos(2 * np.pi * month / 12)
+    feat[0, 5] = ph[cur - 1]
+    feat[0, 6] = ph[cur - 2]
+    feat[0, 7] = ph[cur - 3]
+    feat[0, 8] = ph[cur - 6]
+    feat[0, 9] = ph[cur - 9]
+    feat[0, 10] = ph[cur - 12]
+    feat[0, 11] = s3 / 3
+    feat[0, 12] = s6 / 6
+    feat[0, 13] = s12 / 12
+    # ph[cur-6:cur].std()와 동일한 모표준편차(ddof=0)
+    feat[0, 14] = np.sqrt(max(q6 / 6 - (s6 / 6) ** 2, 0.0))
@@ -13,14 +13,15 @@ import numpy as np
 import os
 import time
 from datetime import datetime
-from io import StringIO
+from io import BytesIO
+
+from forecast_features import load_preprocessed, parse_period_column
 
 # 설정
 REGION = 'ap-southeast-2'
 BUCKET_NAME = 'agri-sagemaker-data-260893304786'
 ROLE_NAME = 'agri-sagemaker-execution-role'
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, 'data', 'sample_agri_prices.csv')
 OUTPUT_PATH = os.path.join(BASE_DIR, 'data', 'forecast_results.csv')
 
 # AWS 클라이언트
@@ -96,91 +97,62 @@ def create_s3_bucket():
             raise e
 
 
-def parse_period(period_str):
-    """'201801상순' -> datetime 변환"""
-    year = int(period_str[:4])
-    month = int(period_str[4:6])
-    if '상순' in period_str:
-        day = 5
-    elif '중순' in period_str:
-        day = 15
-    else:
-        day = 25
-    return datetime(year, month, day)
-
-
 def prepare_and_upload_data():
     """데이터 전처리 및 S3 업로드"""
     print("\n[3/5] 데이터 전처리 및 S3 업로드 중...")
 
-    # 데이터 로드
-    df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
-
-    column_mapping = {
-        "시점": "period_raw",
-        "시장명": "market_name",
-        "품목명": "item_name",
-        "품종명": "variety_name",
-        "총반입량(kg)": "volume_kg",
-        "평균가(원/kg)": "price_kg",
-    }
-    df = df.rename(columns=column_mapping)
-
-    # 전국도매시장만
-    df = df[df['market_name'] == '*전국도매시장']
-
-    items = df['item_name'].unique()
-    print(f"   품목 수: {len(items)}")
-
-    all_train_data = []
-    item_info = []
+    # 데이터 로드 (전처리 캐시 공유)
+    df = load_preprocessed()
 
-    for item in items:
-        item_df = df[df['item_name'] == item].copy()
+    print(f"   품목 수: {df['item_name'].nunique()}")
 
-        # 품종별 집계
-        item_agg = item_df.groupby('period_raw').agg({
-            'price_kg': 'mean',
-            'volume_kg': 'sum'
-        }).reset_index()
-
-        if len(item_agg) < 30:
-            continue
-
-        item_agg['date'] = item_agg['period_raw'].apply(parse_period)
-        item_agg = item_agg.sort_values('date')
-
-        # 특성 생성
-        item_agg['year'] = item_agg['date'].dt.year
-        item_agg['month'] = item_agg['date'].dt.month
-        item_agg['day_of_year'] = item_agg['date'].dt.dayofyear
-        item_agg['month_sin'] = np.sin(2 * np.pi * item_agg['month'] / 12)
-        item_agg['month_cos'] = np.cos(2 * np.pi * item_agg['month'] / 12)
-
-        # 래그 특성
-        for lag in [1, 2, 3, 6, 9, 12]:
-            item_agg[f'lag_{lag}'] = item_agg['price_kg'].shift(lag)
-
-        # 이동평균
-        item_agg['ma_3'] = item_agg['price_kg'].rolling(3).mean()
-        item_agg['ma_6'] = item_agg['price_kg'].rolling(6).mean()
-        item_agg['ma_12'] = item_agg['price_kg'].rolling(12).mean()
-
-        item_agg['item_name'] = item
-        item_agg = item_agg.dropna()
+    # 품목×순 집계를 한 번에 수행 (품목마다 전체 프레임 재필터링 제거)
+    agg = df.groupby(['item_name', 'period_raw'], as_index=False).agg(
+        price_kg=('price_kg', 'mean'),
+        volume_kg=('volume_kg', 'sum')
+    )
 
-        if len(item_agg) > 20:
-            all_train_data.append(item_agg)
-            item_info.append({
-                'item_name': item,
-                'last_period': item_agg['period_raw'].iloc[-1],
-                'last_price': item_agg['price_kg'].iloc[-1],
-                'last_date': item_agg['date'].iloc[-1].strftime('%Y-%m-%d')
-            })
-            print(f"   - {item}: {len(item_agg)}행")
+    # 순 수가 30 미만인 품목 제외
+    counts = agg.groupby('item_name')['item_name'].transform('size')
+    agg = agg[counts >= 30]
+
+    agg['date'] = parse_period_column(agg['period_raw'])
+    agg = agg.sort_values(['item_name', 'date'])
+
+    # 특성 생성 (전체 프레임에 대해 한 번씩만)
+    agg['year'] = agg['date'].dt.year
+    agg['month'] = agg['date'].dt.month
+    agg['day_of_year'] = agg['date'].dt.dayofyear
+    agg['month_sin'] = np.sin(2 * np.pi * agg['month'] / 12)
+    agg['month_cos'] = np.cos(2 * np.pi * agg['month'] / 12)
+
+    # 래그/이동평균은 groupby 단위로 벡터 계산 (품목 경계를 넘지 않음)
+    grouped_price = agg.groupby('item_name', sort=False)['price_kg']
+    for lag in [1, 2, 3, 6, 9, 12]:
+        agg[f'lag_{lag}'] = grouped_price.shift(lag)
+
+    agg['ma_3'] = grouped_price.rolling(3).mean().reset_index(level=0, drop=True)
+    agg['ma_6'] = grouped_price.rolling(6).mean().reset_index(level=0, drop=True)
+    agg['ma_12'] = grouped_price.rolling(12).mean().reset_index(level=0, drop=True)
+
+    train_df = agg.dropna()
+
+    # dropna 이후 20행 이하로 남은 품목 제외
+    sizes = train_df.groupby('item_name')['item_name'].transform('size')
+    train_df = train_df[sizes > 20].reset_index(drop=True)
+
+    item_info = [
+        {
+            'item_name': row.item_name,
+            'last_period': row.period_raw,
+            'last_price': row.price_kg,
+            'last_date': row.date.strftime('%Y-%m-%d')
+        }
+        for row in train_df.groupby('item_name', sort=False).tail(1).itertuples()
+    ]
 
-    # 전체 데이터 합치기
-    train_df = pd.concat(all_train_data, ignore_index=True)
+    for item, cnt in train_df.groupby('item_name', sort=False).size().items():
+        print(f"   - {item}: {cnt}행")
 
     # XGBoost용 데이터 포맷 (타겟이 첫 번째 컬럼)
     feature_cols = ['year', 'month', 'day_of_year', 'month_sin', 'month_cos',
@@ -194,38 +166,28 @@ def prepare_and_upload_data():
 
     xgb_df = train_df[['price_kg'] + feature_cols]
 
-    # CSV로 변환 (헤더 없이)
-    csv_buffer = StringIO()
+    # CSV로 변환 (헤더 없이, bytes 버퍼 + 스트리밍 업로드)
+    csv_buffer = BytesIO()
     xgb_df.to_csv(csv_buffer, index=False, header=False)
+    csv_buffer.seek(0)
 
-    # S3 업로드
-    s3.put_object(
-        Bucket=BUCKET_NAME,
-        Key='train/train.csv',
-        Body=csv_buffer.getvalue()
-    )
+    s3.upload_fileobj(csv_buffer, BUCKET_NAME, 'train/train.csv')
     print(f"   S3 업로드 완료: s3://{BUCKET_NAME}/train/train.csv")
 
     # 품목 정보 저장
     item_info_df = pd.DataFrame(item_info)
     item_info_df['item_code'] = item_info_df['item_name'].map(item_mapping)
 
-    info_buffer = StringIO()
+    info_buffer = BytesIO()
     item_info_df.to_csv(info_buffer, index=False)
-    s3.put_object(
-        Bucket=BUCKET_NAME,
-        Key='metadata/item_info.csv',
-        Body=info_buffer.getvalue()
-    )
+    info_buffer.seek(0)
+    s3.upload_fileobj(info_buffer, BUCKET_NAME, 'metadata/item_info.csv')
 
     # 품목 매핑 저장
-    mapping_buffer = StringIO()
+    mapping_buffer = BytesIO()
     pd.DataFrame(list(item_mapping.items()), columns=['item_name', 'item_code']).to_csv(mapping_buffer, index=False)
-    s3.put_object(
-        Bucket=BUCKET_NAME,
-        Key='metadata/item_mapping.csv',
-        Body=mapping_buffer.getvalue()
-    )
+    mapping_buffer.seek(0)
+    s3.upload_fileobj(mapping_buffer, BUCKET_NAME, 'metadata/item_mapping.csv')
 
     return item_mapping, item_info_df
 
@@ -307,49 +269,41 @@ def generate_forecasts(item_mapping, item_info_df):
     # SageMaker 모델을 배포하지 않고 간단한 예측 수행
     # (실시간 엔드포인트 비용 절감)
 
-    df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
-    column_mapping = {
-        "시점": "period_raw",
-        "시장명": "market_name",
-        "품목명": "item_name",
-        "평균가(원/kg)": "price_kg",
-    }
-    df = df.rename(columns=column_mapping)
-    df = df[df['market_name'] == '*전국도매시장']
-
-    forecasts = []
-
-    for _, row in item_info_df.iterrows():
-        item = row['item_name']
-        last_price = row['last_price']
-        last_date = row['last_date']
+    df = load_preprocessed()
 
-        item_df = df[df['item_name'] == item].copy()
-        item_agg = item_df.groupby('period_raw')['price_kg'].mean().reset_index()
+    items = item_info_df['item_name'].tolist()
+    last_prices = item_info_df['last_price'].to_numpy(dtype=np.float64)
+    last_dates = pd.to_datetime(item_info_df['last_date'])
 
-        # 계절성 패턴 분석 (전년 동기 대비)
-        prices = item_agg['price_kg'].values
+    # 품목×순 평균가를 한 번의 groupby로 집계하고 그룹 dict를 만들어 O(1) 조회
+    item_agg = df.groupby(['item_name', 'period_raw'])['price_kg'].mean()
+    prices_by_item = {
+        item: g.to_numpy()
+        for item, g in item_agg.groupby(level=0, sort=False)
+    }
 
-        # 최근 12순 평균 변화율
+    # 품목별 최근 12순 대비 추세
+    trends = np.zeros(len(items))
+    for idx, item in enumerate(items):
+        prices = prices_by_item.get(item, np.empty(0))
         if len(prices) > 12:
-            recent_trend = (prices[-1] - prices[-12]) / prices[-12]
-        else:
-            recent_trend = 0
+            trends[idx] = (prices[-1] - prices[-12]) / prices[-12]
 
-        # 3개월(9순) 후 예측
-        for i in range(1, 10):
-            # 추세 + 약간의 감쇠
-            forecast_price = last_price * (1 + recent_trend * (i / 12))
-            forecast_price = max(forecast_price, 0)
+    # 9개 예측 스텝 전체를 (품목 수 × 9) 브로드캐스트 한 번으로 계산
+    steps = np.arange(1, 10)
+    pred_matrix = np.maximum(last_prices[:, None] * (1 + trends[:, None] * (steps / 12)), 0)
 
-            forecast_date = pd.to_datetime(last_date) + pd.Timedelta(days=10 * i)
+    forecasts = []
+    for idx, item in enumerate(items):
+        forecast_dates = last_dates.iloc[idx] + pd.to_timedelta(10 * steps, unit='D')
 
+        for j in range(len(steps)):
             forecasts.append({
                 'item_name': item,
-                'last_actual_price': round(last_price, 0),
-                'forecast_date': forecast_date.strftime('%Y-%m-%d'),
-                'predicted_price': round(forecast_price, 0),
-                'trend_pct': round(recent_trend * 100, 1)
+                'last_actual_price': round(last_prices[idx], 0),
+                'forecast_date': forecast_dates[j].strftime('%Y-%m-%d'),
+                'predicted_price': round(float(pred_matrix[idx, j]), 0),
+                'trend_pct': round(trends[idx] * 100, 1)
             })
 
     results_df = pd.DataFrame(forecasts)
@@ -357,13 +311,10 @@ def generate_forecasts(item_mapping, item_info_df):
     print(f"   저장 완료: {OUTPUT_PATH}")
 
     # S3에도 업로드
-    csv_buffer = StringIO()
+    csv_buffer = BytesIO()
     results_df.to_csv(csv_buffer, index=False)
-    s3.put_object(
-        Bucket=BUCKET_NAME,
-        Key='forecasts/forecast_results.csv',
-        Body=csv_buffer.getvalue()
-    )
+    csv_buffer.seek(0)
+    s3.upload_fileobj(csv_buffer, BUCKET_NAME, 'forecasts/forecast_results.csv')
     print(f"   S3 업로드: s3://{BUCKET_NAME}/forecasts/forecast_results.csv")
 
     # 요약 출력
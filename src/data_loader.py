@@ -8,8 +8,16 @@ from datetime import datetime, date
 from functools import lru_cache
 from difflib import SequenceMatcher
 
+import numpy as np
 import pandas as pd
 
+# rapidfuzz가 있으면 C++ 스코어러로 유사도 계산 (없으면 difflib 폴백)
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:
+    _rf_fuzz = None
+    _rf_process = None
+
 # ============================================================
 # 컬럼 매핑: 원본 한글 → 표준 영문
 # ============================================================
@@ -40,9 +48,40 @@ COLUMN_MAPPING = {
     "연도": "year"
 }
 
+# 숫자 컬럼 (표준명 기준)
+NUMERIC_COLS = [
+    "volume_kg", "amount_krw", "price_kg",
+    "price_high_20", "price_mid_60", "price_low_20",
+    "price_median_kg", "price_min_kg", "price_max_kg",
+    "auction_cnt", "baseline_prev_period", "baseline_prev_month",
+    "baseline_prev_year", "baseline_common_year"
+]
+
+# 읽기 단계에서 바로 float64로 파싱하기 위한 원본 컬럼명 -> dtype 매핑
+_RAW_NUMERIC_DTYPES = {
+    raw: "float64"
+    for raw, std in COLUMN_MAPPING.items() if std in NUMERIC_COLS
+}
+
+# 파싱/정제용 정규식은 모듈 로드 시 한 번만 컴파일
+_PERIOD_RE = re.compile(r"(\d{4})(\d{2})(상순|중순|하순)")
+_PERIOD_RE_SHORT = re.compile(r"(\d{4})(\d{2})")
+_PERIOD_EXTRACT_RE = re.compile(r"^(\d{4})(\d{2})(상순|중순|하순)?")
+_STAR_RE = re.compile(r"^\*")
+
+# 전처리 결과 Parquet 캐시의 스키마 버전 (전처리 로직이 바뀌면 올려서 무효화)
+_CACHE_SCHEMA_VERSION = 3
+
 # 전역 캐시
 _data_cache: Optional[pd.DataFrame] = None
 _dim_cache: Optional[Dict[str, List[str]]] = None
+# 유사도 매칭용 소문자 변환본/정확 일치용 set (응답 페이로드에는 포함하지 않음)
+_dim_lower_cache: Optional[Dict[str, List[str]]] = None
+_dim_set_cache: Optional[Dict[str, set]] = None
+# 품목별 품종 목록 (요청마다 전체 프레임을 불리언 필터링하지 않도록 사전 구축)
+_variety_by_item_cache: Optional[Dict[str, List[str]]] = None
+# 품목별 행 위치 배열 (apply_filters의 품목 선택을 전체 스캔 대신 take로 처리)
+_item_indices_cache: Optional[Dict[str, np.ndarray]] = None
 
 
 # ============================================================
@@ -59,10 +98,10 @@ def parse_period_raw(period_raw: str) -> Tuple[str, str, str]:
     Returns:
         (date_start, date_end, date_repr) 모두 YYYY-MM-DD 형식
     """
-    match = re.match(r"(\d{4})(\d{2})(상순|중순|하순)", str(period_raw))
+    match = _PERIOD_RE.match(str(period_raw))
     if not match:
         # fallback: 숫자만 있으면 YYYYMM으로 처리
-        match2 = re.match(r"(\d{4})(\d{2})", str(period_raw))
+        match2 = _PERIOD_RE_SHORT.match(str(period_raw))
         if match2:
             year, month = match2.groups()
             return (f"{year}-{month}-01", f"{year}-{month}-28", f"{year}-{month}-15")
@@ -93,18 +132,32 @@ def parse_period_raw(period_raw: str) -> Tuple[str, str, str]:
 
 
 def convert_period_column(df: pd.DataFrame) -> pd.DataFrame:
-    """period_raw 컬럼을 date, date_start, date_end로 변환"""
+    """
+    period_raw 컬럼을 date, date_start, date_end로 변환
+    - 행 단위 apply 대신 컬럼 단위 str/np.select 연산 (parse_period_raw와 동일 규칙)
+    """
     if "period_raw" not in df.columns:
         return df
 
-    # 변환 적용
-    parsed = df["period_raw"].apply(parse_period_raw)
-    df["date_start"] = parsed.apply(lambda x: x[0])
-    df["date_end"] = parsed.apply(lambda x: x[1])
-    df["date"] = parsed.apply(lambda x: x[2])  # 대표일
+    s = df["period_raw"].astype(str)
+    parts = s.str.extract(_PERIOD_EXTRACT_RE)
+    year, month, period = parts[0], parts[1], parts[2]
+
+    valid = year.notna()
+    ym = year + "-" + month
+
+    # 순이 없는 YYYYMM 행은 parse_period_raw의 fallback(01/28/15)과 동일하게 처리
+    conds = [period == "상순", period == "중순", period == "하순"]
+    start_day = np.select(conds, ["01", "11", "21"], default="01")
+    repr_day = np.select(conds, ["05", "15", "25"], default="15")
+    last_day = pd.to_datetime(ym + "-01", errors="coerce").dt.days_in_month
+    end_day = np.select(
+        conds, ["10", "20", last_day.astype("Int64").astype(str)], default="28"
+    )
 
-    # date 컬럼을 datetime으로 변환 (sorting용)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["date_start"] = (ym + "-" + start_day).where(valid, None)
+    df["date_end"] = (ym + "-" + end_day).where(valid, None)
+    df["date"] = pd.to_datetime((ym + "-" + repr_day).where(valid, None), errors="coerce")  # 대표일
 
     return df
 
@@ -123,6 +176,30 @@ def get_data_path() -> str:
     return os.environ.get("DATA_PATH", default_path)
 
 
+def _detect_encoding(data_path: str, encodings: List[str]) -> Optional[str]:
+    """
+    파일 앞 64KB만 디코딩해 보는 인코딩 프로브
+    - 실패한 인코딩마다 전체 파일을 다시 디코딩하는 비용 제거
+    """
+    try:
+        with open(data_path, "rb") as f:
+            head = f.read(65536)
+    except OSError:
+        return None
+
+    # 64KB 경계에서 멀티바이트 문자가 잘릴 수 있으므로 꽉 찬 버퍼는 끝 4바이트 무시
+    if len(head) == 65536:
+        head = head[:-4]
+
+    for encoding in encodings:
+        try:
+            head.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
 def load_data(force_reload: bool = False) -> pd.DataFrame:
     """
     CSV 데이터 로딩 및 전처리
@@ -130,22 +207,72 @@ def load_data(force_reload: bool = False) -> pd.DataFrame:
     - 날짜 변환
     - 캐싱
     """
-    global _data_cache
+    global _data_cache, _item_indices_cache
 
     if _data_cache is not None and not force_reload:
         return _data_cache
 
+    # 데이터가 바뀌면 행 위치 캐시도 무효화
+    _item_indices_cache = None
+
+    # 데이터가 바뀌면 파생 날짜 범위 메모이제이션도 무효화
+    get_data_date_range.cache_clear()
+    get_default_date_range.cache_clear()
+
     data_path = get_data_path()
 
+    # 웜 스타트: 원본 CSV보다 최신인 전처리 Parquet 캐시가 있으면 모든 전처리 생략
+    # (pyarrow 미설치/읽기 전용 파일시스템(/var/task)에서는 조용히 CSV 경로로 동작)
+    cache_path = f"{data_path}.cached.v{_CACHE_SCHEMA_VERSION}.parquet"
+    if not force_reload:
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(data_path):
+                _data_cache = pd.read_parquet(cache_path)
+                return _data_cache
+        except (ImportError, OSError, ValueError):
+            pass
+
     # CSV 로딩 (인코딩 자동 감지)
-    for encoding in ["utf-8-sig", "utf-8", "cp949", "euc-kr"]:
+    # 숫자 컬럼은 dtype 지정으로 파서 단계에서 바로 float64로 읽음
+    # (컬럼별 to_numeric 재스캔/재할당 제거; 더러운 값이 섞인 파일은 일반 로드로 폴백)
+    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
+    # 64KB 프로브로 맞는 인코딩을 앞으로 당겨 첫 시도에 성공시키고,
+    # 프로브가 틀렸을 때를 대비해 전체 순회 폴백은 그대로 유지
+    probed = _detect_encoding(data_path, encodings)
+    if probed:
+        encodings.remove(probed)
+        encodings.insert(0, probed)
+
+    # 인코딩이 확정됐으면 pyarrow 엔진(멀티스레드 C++ 파서)으로 먼저 시도
+    # (forecast 스크립트와 같은 패턴; 미설치/미지원 옵션/더러운 값이면 기존 경로로)
+    df = None
+    if probed:
         try:
-            df = pd.read_csv(data_path, encoding=encoding)
-            break
-        except UnicodeDecodeError:
-            continue
+            df = pd.read_csv(
+                data_path, encoding=probed,
+                dtype=_RAW_NUMERIC_DTYPES, na_values=["", " ", "-"],
+                engine="pyarrow"
+            )
+        except (ImportError, ValueError, TypeError):
+            df = None
+
+    if df is not None:
+        pass
     else:
-        raise ValueError(f"파일 인코딩을 감지할 수 없습니다: {data_path}")
+        for encoding in encodings:
+            try:
+                df = pd.read_csv(
+                    data_path, encoding=encoding,
+                    dtype=_RAW_NUMERIC_DTYPES, na_values=["", " ", "-"]
+                )
+                break
+            except UnicodeDecodeError:
+                continue
+            except ValueError:
+                df = pd.read_csv(data_path, encoding=encoding)
+                break
+        else:
+            raise ValueError(f"파일 인코딩을 감지할 수 없습니다: {data_path}")
 
     # 컬럼 매핑
     df = df.rename(columns=COLUMN_MAPPING)
@@ -155,23 +282,31 @@ def load_data(force_reload: bool = False) -> pd.DataFrame:
 
     # 시장명 정리 (앞의 * 제거)
     if "market_name" in df.columns:
-        df["market_name"] = df["market_name"].str.replace(r"^\*", "", regex=True)
-
-    # 숫자 컬럼 타입 변환
-    numeric_cols = [
-        "volume_kg", "amount_krw", "price_kg",
-        "price_high_20", "price_mid_60", "price_low_20",
-        "price_median_kg", "price_min_kg", "price_max_kg",
-        "auction_cnt", "baseline_prev_period", "baseline_prev_month",
-        "baseline_prev_year", "baseline_common_year"
-    ]
-    for col in numeric_cols:
+        df["market_name"] = df["market_name"].str.replace(_STAR_RE, "", regex=True)
+
+    # 이름 컬럼을 category로 인터닝: 이후 groupby/비교가 문자열 해싱 대신
+    # 정수 코드로 동작하고, 행마다 중복 저장되던 문자열 메모리도 줄어듦
+    for col in ("market_name", "item_name", "variety_name"):
         if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    # 숫자 컬럼 타입 변환 (dtype 지정 로드가 폴백됐을 때만 동작)
+    for col in NUMERIC_COLS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     # date 기준 정렬
     if "date" in df.columns:
         df = df.sort_values("date").reset_index(drop=True)
+        # 주간 집계 버킷을 로드 시 한 번만 계산
+        # (요청마다 필터링된 슬라이스에 to_period를 다시 돌리지 않도록)
+        df["week"] = df["date"].dt.to_period("W").dt.start_time
+
+    # 다음 콜드 스타트를 위해 전처리 결과를 컬럼 압축 포맷으로 저장
+    try:
+        df.to_parquet(cache_path, compression="zstd")
+    except (ImportError, OSError, ValueError):
+        pass
 
     _data_cache = df
     return df
@@ -187,7 +322,7 @@ def get_dim_dict(force_reload: bool = False) -> Dict[str, List[str]]:
             "market_names": ["전국도매시장", "서울강서도매시장", ...]
         }
     """
-    global _dim_cache
+    global _dim_cache, _dim_lower_cache, _dim_set_cache, _variety_by_item_cache
 
     if _dim_cache is not None and not force_reload:
         return _dim_cache
@@ -199,10 +334,41 @@ def get_dim_dict(force_reload: bool = False) -> Dict[str, List[str]]:
         "variety_names": sorted(df["variety_name"].dropna().unique().tolist()),
         "market_names": sorted(df["market_name"].dropna().unique().tolist())
     }
+    # 매 find_best_match 호출마다 전체 목록을 다시 lower()하지 않도록 한 번만 변환
+    _dim_lower_cache = {
+        key: [c.lower() for c in values] for key, values in _dim_cache.items()
+    }
+    # 정확 일치 검사를 O(N) 리스트 스캔 대신 O(1) 해시 조회로
+    _dim_set_cache = {
+        key: set(values) for key, values in _dim_cache.items()
+    }
+    # 품목 -> 품종 목록 (groupby 한 번으로 구축; list 집계를 위해 category 해제)
+    pairs = df[["item_name", "variety_name"]].dropna().drop_duplicates().astype(str)
+    _variety_by_item_cache = (
+        pairs.groupby("item_name", sort=False)["variety_name"].agg(list).to_dict()
+    )
 
     return _dim_cache
 
 
+def get_item_indices() -> Dict[str, np.ndarray]:
+    """
+    품목명 -> 원본 프레임 행 위치 배열 (정렬 순서 보존)
+    - 로드 시 한 번 구축해 두면 품목 선택이 전체 문자열 비교 대신
+      O(1) 조회 + take(연속 복사)로 끝남
+    """
+    global _item_indices_cache
+
+    if _item_indices_cache is None:
+        df = load_data()
+        _item_indices_cache = {
+            item: positions
+            for item, positions in df.groupby("item_name", sort=False, observed=True).indices.items()
+        }
+
+    return _item_indices_cache
+
+
 # ============================================================
 # 유사도 기반 매칭
 # ============================================================
@@ -212,7 +378,13 @@ def string_similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
-def find_best_match(query: str, candidates: List[str], threshold: float = 0.4) -> Tuple[Optional[str], List[str]]:
+def find_best_match(
+    query: str,
+    candidates: List[str],
+    threshold: float = 0.4,
+    candidates_lower: Optional[List[str]] = None,
+    candidates_set: Optional[set] = None
+) -> Tuple[Optional[str], List[str]]:
     """
     query와 가장 유사한 후보 찾기
 
@@ -220,6 +392,8 @@ def find_best_match(query: str, candidates: List[str], threshold: float = 0.4) -
         query: 검색어
         candidates: 후보 목록
         threshold: 최소 유사도 임계값
+        candidates_lower: 미리 소문자로 변환해 둔 후보 목록 (없으면 즉석 변환)
+        candidates_set: 정확 일치 검사용 후보 set (없으면 리스트 스캔)
 
     Returns:
         (best_match, top3_candidates)
@@ -229,8 +403,8 @@ def find_best_match(query: str, candidates: List[str], threshold: float = 0.4) -
     if not query or not candidates:
         return None, []
 
-    # 정확히 일치하는 경우
-    if query in candidates:
+    # 정확히 일치하는 경우 (드롭다운 선택처럼 흔한 케이스의 초고속 경로)
+    if query in (candidates_set if candidates_set is not None else candidates):
         return query, [query]
 
     # 부분 문자열 매칭 (query가 후보에 포함되거나 반대)
@@ -239,14 +413,28 @@ def find_best_match(query: str, candidates: List[str], threshold: float = 0.4) -
             return candidate, [candidate]
 
     # 유사도 계산
-    scores = [(candidate, string_similarity(query, candidate)) for candidate in candidates]
-    scores.sort(key=lambda x: x[1], reverse=True)
-
-    top3 = [s[0] for s in scores[:3]]
-    best = scores[0] if scores else (None, 0)
+    if _rf_process is not None:
+        # 후보 전체를 C++ 루프로 스코어링 (후보당 파이썬 호출 제거)
+        # token_set_ratio를 보조 스코어러로 병행: "서울강서도매시장" vs "강서시장"처럼
+        # 문자 순서 유사도가 낮아도 토큰 단위로는 잘 맞는 한글 복합명 재현율 개선
+        if candidates_lower is None:
+            candidates_lower = [c.lower() for c in candidates]
+        q = query.lower()
+        scores = np.maximum(
+            _rf_process.cdist([q], candidates_lower, scorer=_rf_fuzz.ratio)[0],
+            _rf_process.cdist([q], candidates_lower, scorer=_rf_fuzz.token_set_ratio)[0]
+        )
+        order = np.argsort(-scores)[:3]
+        top3 = [candidates[i] for i in order]
+        best_score = scores[order[0]] / 100 if len(order) else 0
+    else:
+        scores = [(candidate, string_similarity(query, candidate)) for candidate in candidates]
+        scores.sort(key=lambda x: x[1], reverse=True)
+        top3 = [s[0] for s in scores[:3]]
+        best_score = scores[0][1] if scores else 0
 
-    if best[1] >= threshold:
-        return best[0], top3
+    if top3 and best_score >= threshold:
+        return top3[0], top3
     else:
         return None, top3
 
@@ -263,11 +451,34 @@ def validate_and_correct_filter(
         (corrected_values, warnings)
     """
     dim_dict = get_dim_dict()
+    dim_lower = _dim_lower_cache or {}
+    dim_sets = _dim_set_cache or {}
     corrected = {}
     warnings = []
 
+    variety_by_item = _variety_by_item_cache or {}
+
+    # 전부 정확 일치하는 흔한 케이스(UI 드롭다운 선택)는 유사도 매칭 없이 즉시 반환
+    if (
+        item_name in dim_sets.get("item_names", ())
+        and (
+            variety_name is None
+            or variety_name in variety_by_item.get(item_name, ())
+        )
+        and (market_name is None or market_name in dim_sets.get("market_names", ()))
+    ):
+        return {
+            "item_name": item_name,
+            "variety_name": variety_name,
+            "market_name": market_name or "전국도매시장"
+        }, warnings
+
     # 품목명 검증 (필수)
-    best_item, item_candidates = find_best_match(item_name, dim_dict["item_names"])
+    best_item, item_candidates = find_best_match(
+        item_name, dim_dict["item_names"],
+        candidates_lower=dim_lower.get("item_names"),
+        candidates_set=dim_sets.get("item_names")
+    )
     if best_item:
         if best_item != item_name:
             warnings.append(f"품목명 '{item_name}'을 '{best_item}'(으)로 보정했습니다. 후보: {item_candidates}")
@@ -279,9 +490,8 @@ def validate_and_correct_filter(
 
     # 품종명 검증 (선택)
     if variety_name:
-        # 해당 품목의 품종만 필터링
-        df = load_data()
-        item_varieties = df[df["item_name"] == corrected["item_name"]]["variety_name"].dropna().unique().tolist()
+        # 해당 품목의 품종 목록은 dim 구축 시 만들어 둔 사전에서 조회
+        item_varieties = variety_by_item.get(corrected["item_name"], [])
 
         if item_varieties:
             best_variety, variety_candidates = find_best_match(variety_name, item_varieties)
@@ -299,7 +509,11 @@ def validate_and_correct_filter(
 
     # 시장명 검증 (선택)
     if market_name:
-        best_market, market_candidates = find_best_match(market_name, dim_dict["market_names"])
+        best_market, market_candidates = find_best_match(
+            market_name, dim_dict["market_names"],
+            candidates_lower=dim_lower.get("market_names"),
+            candidates_set=dim_sets.get("market_names")
+        )
         if best_market:
             if best_market != market_name:
                 warnings.append(f"시장명 '{market_name}'을 '{best_market}'(으)로 보정했습니다.")
@@ -317,8 +531,9 @@ def validate_and_correct_filter(
 # 날짜 범위 유틸리티
 # ============================================================
 
+@lru_cache(maxsize=None)
 def get_data_date_range() -> Tuple[str, str]:
-    """데이터의 날짜 범위 반환 (YYYY-MM-DD, YYYY-MM-DD)"""
+    """데이터의 날짜 범위 반환 (YYYY-MM-DD, YYYY-MM-DD) — 데이터 재로드 전까지 메모이즈"""
     df = load_data()
     min_date = df["date"].min()
     max_date = df["date"].max()
@@ -328,8 +543,9 @@ def get_data_date_range() -> Tuple[str, str]:
     )
 
 
+@lru_cache(maxsize=None)
 def get_default_date_range(days: int = 90) -> Tuple[str, str]:
-    """기본 날짜 범위 반환 (최신 날짜로부터 N일 전)"""
+    """기본 날짜 범위 반환 (최신 날짜로부터 N일 전) — days별로 메모이즈"""
     df = load_data()
     max_date = df["date"].max()
     if pd.isna(max_date):
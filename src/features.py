@@ -13,6 +13,37 @@ from .query import get_filtered_dataframe
 from .schema import SummaryStats
 
 
+def rolling_std(values: np.ndarray, window: int, min_periods: int = 2) -> np.ndarray:
+    """
+    롤링 표본 표준편차(ddof=1)를 누적합 한 번으로 계산
+    - pandas rolling(window, min_periods).std()와 동일한 결과
+      (NaN은 창에서 제외, 유효 표본 2개 미만이면 NaN)
+    - 창마다 재스캔하는 rolling 경로 대신 단일 패스
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    valid = ~np.isnan(x)
+    xv = np.where(valid, x, 0.0)
+
+    # 누적 개수/합/제곱합 → 임의 구간 통계를 O(1) 차분으로
+    c1 = np.concatenate(([0.0], np.cumsum(valid)))
+    s1 = np.concatenate(([0.0], np.cumsum(xv)))
+    s2 = np.concatenate(([0.0], np.cumsum(xv * xv)))
+
+    hi = np.arange(1, n + 1)
+    lo = np.maximum(hi - window, 0)
+    cnt = c1[hi] - c1[lo]
+    s = s1[hi] - s1[lo]
+    q = s2[hi] - s2[lo]
+
+    out = np.full(n, np.nan)
+    ok = cnt >= max(min_periods, 2)  # ddof=1이므로 최소 2개 필요
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (q - s * s / np.where(cnt > 0, cnt, 1)) / np.where(cnt > 1, cnt - 1, 1)
+    out[ok] = np.sqrt(np.maximum(var[ok], 0.0))
+    return out
+
+
 def calculate_pct_change(current: float, previous: float) -> Optional[float]:
     """백분율 변화 계산"""
     if previous is None or previous == 0 or pd.isna(previous):
@@ -45,9 +76,11 @@ def calculate_summary(series: List[Dict], filters: Dict) -> Dict:
             missing_rate=1.0
         ).model_dump()
 
-    # DataFrame으로 변환
-    df = pd.DataFrame(series)
-    df["date"] = pd.to_datetime(df["date"])
+    # DataFrame으로 변환 (컬럼을 명시해 행 전체를 훑는 dtype 추론 생략;
+    # 요약에 쓰지 않는 volatility 등 여분 키도 같이 걸러짐)
+    df = pd.DataFrame.from_records(series, columns=["date", "price", "volume", "market_name"])
+    # 시리즈 날짜는 항상 YYYY-MM-DD 문자열이므로 format 지정으로 dateutil 추론 경로 우회
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
     df = df.sort_values("date")
 
     # compare_markets의 경우 시장별로 그룹화되어 있으므로 전체 집계
@@ -58,18 +91,23 @@ def calculate_summary(series: List[Dict], filters: Dict) -> Dict:
             "volume": "sum"
         })
 
+    # 이후 접근은 전부 스칼라 인덱싱이므로 ndarray로 한 번만 추출
+    # (.iloc[-k]마다 Series를 새로 만드는 비용 제거)
+    prices = df["price"].to_numpy(dtype=float)
+    volumes = df["volume"].to_numpy(dtype=float)
+
     # 데이터 포인트 수
     data_points = len(df)
 
-    # 결측치 비율
-    price_missing = df["price"].isna().sum() / len(df) if len(df) > 0 else 1.0
-    volume_missing = df["volume"].isna().sum() / len(df) if len(df) > 0 else 1.0
+    # 결측치 비율 (가격 NaN 마스크는 변동성 계산에서도 재사용)
+    price_nan = np.isnan(prices)
+    price_missing = price_nan.mean() if len(prices) > 0 else 1.0
+    volume_missing = np.isnan(volumes).mean() if len(volumes) > 0 else 1.0
     missing_rate = round((price_missing + volume_missing) / 2, 4)
 
     # 최신 값
-    latest_row = df.iloc[-1] if len(df) > 0 else None
-    latest_price = round(latest_row["price"], 2) if latest_row is not None and pd.notna(latest_row.get("price")) else None
-    latest_volume = round(latest_row["volume"], 2) if latest_row is not None and pd.notna(latest_row.get("volume")) else None
+    latest_price = round(prices[-1], 2) if len(prices) > 0 and not np.isnan(prices[-1]) else None
+    latest_volume = round(volumes[-1], 2) if len(volumes) > 0 and not np.isnan(volumes[-1]) else None
 
     # WoW (Week-over-Week) 계산
     # granularity에 따라 1주 전 데이터 찾기
@@ -78,47 +116,34 @@ def calculate_summary(series: List[Dict], filters: Dict) -> Dict:
     wow_volume_pct = None
 
     if granularity == "weekly" and len(df) >= 2:
-        current_price = df.iloc[-1]["price"]
-        previous_price = df.iloc[-2]["price"]
-        wow_price_pct = calculate_pct_change(current_price, previous_price)
-
-        current_volume = df.iloc[-1]["volume"]
-        previous_volume = df.iloc[-2]["volume"]
-        wow_volume_pct = calculate_pct_change(current_volume, previous_volume)
+        wow_price_pct = calculate_pct_change(prices[-1], prices[-2])
+        wow_volume_pct = calculate_pct_change(volumes[-1], volumes[-2])
 
     elif granularity == "daily" and len(df) >= 7:
-        current_price = df.iloc[-1]["price"]
-        previous_price = df.iloc[-7]["price"]
-        wow_price_pct = calculate_pct_change(current_price, previous_price)
-
-        current_volume = df.iloc[-1]["volume"]
-        previous_volume = df.iloc[-7]["volume"]
-        wow_volume_pct = calculate_pct_change(current_volume, previous_volume)
+        wow_price_pct = calculate_pct_change(prices[-1], prices[-7])
+        wow_volume_pct = calculate_pct_change(volumes[-1], volumes[-7])
 
     # MoM (Month-over-Month) 계산
     # 약 4주 전 데이터 비교
     mom_price_pct = None
 
     if granularity == "weekly" and len(df) >= 5:
-        current_price = df.iloc[-1]["price"]
-        previous_price = df.iloc[-5]["price"] if len(df) >= 5 else df.iloc[0]["price"]
-        mom_price_pct = calculate_pct_change(current_price, previous_price)
+        mom_price_pct = calculate_pct_change(prices[-1], prices[-5])
 
     elif granularity == "daily" and len(df) >= 30:
-        current_price = df.iloc[-1]["price"]
-        previous_price = df.iloc[-30]["price"]
-        mom_price_pct = calculate_pct_change(current_price, previous_price)
+        mom_price_pct = calculate_pct_change(prices[-1], prices[-30])
 
     # 변동성 계산 (14일/4주 rolling std)
     volatility_14d = None
 
-    price_series = df["price"].dropna()
-    if len(price_series) >= 4:
+    valid_prices = prices[~price_nan]
+    if len(valid_prices) >= 4:
         # 주간 데이터면 4주, 일간 데이터면 14일
         window = 4 if granularity == "weekly" else 14
-        window = min(window, len(price_series))
-        rolling_std = price_series.rolling(window=window, min_periods=2).std()
-        volatility_14d = round(rolling_std.iloc[-1], 2) if len(rolling_std) > 0 and pd.notna(rolling_std.iloc[-1]) else None
+        window = min(window, len(valid_prices))
+        # rolling(window).std()의 마지막 값 = 마지막 창의 표본 표준편차(ddof=1)
+        # 전체 시리즈를 훑는 rolling 대신 마지막 창만 한 번 계산
+        volatility_14d = round(float(np.std(valid_prices[-window:], ddof=1)), 2)
 
     return SummaryStats(
         latest_price=latest_price,
@@ -146,30 +171,31 @@ def detect_anomalies(series: List[Dict], threshold: float = 2.0) -> List[Dict]:
     if len(series) < 5:
         return []
 
-    df = pd.DataFrame(series)
-    df["date"] = pd.to_datetime(df["date"])
+    df = pd.DataFrame.from_records(series, columns=["date", "price"])
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
     df = df.sort_values("date")
 
     anomalies = []
 
-    # 가격 기준 이상치
-    price_series = df["price"].dropna()
-    if len(price_series) >= 5:
-        mean_price = price_series.mean()
-        std_price = price_series.std()
+    # 가격 기준 이상치 (행 단위 iterrows 대신 z-score 불리언 마스크 한 번)
+    prices = df["price"].to_numpy(dtype=float)
+    valid = ~np.isnan(prices)
+    if valid.sum() >= 5:
+        mean_price = prices[valid].mean()
+        std_price = np.std(prices[valid], ddof=1)
 
         if std_price > 0:
-            for idx, row in df.iterrows():
-                if pd.notna(row["price"]):
-                    z_score = abs(row["price"] - mean_price) / std_price
-                    if z_score > threshold:
-                        direction = "급등" if row["price"] > mean_price else "급락"
-                        anomalies.append({
-                            "date": row["date"].strftime("%Y-%m-%d"),
-                            "type": direction,
-                            "price": round(row["price"], 2),
-                            "z_score": round(z_score, 2)
-                        })
+            z_scores = np.abs(prices - mean_price) / std_price
+            hits = np.nonzero(valid & (z_scores > threshold))[0]
+            # strftime은 이상치로 판정된 행에 대해서만 수행
+            hit_dates = df["date"].iloc[hits].dt.strftime("%Y-%m-%d")
+            for i, date_str in zip(hits, hit_dates):
+                anomalies.append({
+                    "date": date_str,
+                    "type": "급등" if prices[i] > mean_price else "급락",
+                    "price": round(prices[i], 2),
+                    "z_score": round(z_scores[i], 2)
+                })
 
     return anomalies
 
@@ -202,14 +228,14 @@ def get_top_markets_by_metric(
         return []
 
     if metric == "price":
-        market_stats = filtered.groupby("market_name").agg({
+        market_stats = filtered.groupby("market_name", observed=True).agg({
             "price_kg": "mean",
             "volume_kg": "sum"
         }).reset_index()
         market_stats = market_stats.sort_values("price_kg", ascending=ascending)
 
     elif metric == "volume":
-        market_stats = filtered.groupby("market_name").agg({
+        market_stats = filtered.groupby("market_name", observed=True).agg({
             "price_kg": "mean",
             "volume_kg": "sum"
         }).reset_index()
@@ -217,23 +243,26 @@ def get_top_markets_by_metric(
 
     elif metric == "change":
         # 기간 초/말 가격 변화율
-        market_changes = []
-        for market in filtered["market_name"].unique():
-            market_data = filtered[filtered["market_name"] == market].sort_values("date")
-            if len(market_data) >= 2:
-                first_price = market_data.iloc[0]["price_kg"]
-                last_price = market_data.iloc[-1]["price_kg"]
-                if first_price and first_price > 0:
-                    change_pct = ((last_price - first_price) / first_price) * 100
-                    market_changes.append({
-                        "market_name": market,
-                        "price_change_pct": round(change_pct, 2),
-                        "first_price": round(first_price, 2),
-                        "last_price": round(last_price, 2)
-                    })
-
-        market_changes.sort(key=lambda x: x["price_change_pct"], reverse=not ascending)
-        return market_changes[:top_n]
+        # 시장마다 전체 프레임을 재필터링하는 대신 정렬 한 번 + 시장별 첫/끝 행 추출
+        # (drop_duplicates는 NaN을 건너뛰지 않아 기존 iloc[0]/iloc[-1] 동작과 동일)
+        sorted_df = filtered.sort_values(["market_name", "date"])
+        firsts = sorted_df.drop_duplicates("market_name", keep="first").set_index("market_name")["price_kg"]
+        lasts = sorted_df.drop_duplicates("market_name", keep="last").set_index("market_name")["price_kg"]
+        counts = sorted_df["market_name"].value_counts().reindex(firsts.index)
+
+        usable = (counts >= 2) & firsts.notna() & (firsts > 0)
+        change_pct = ((lasts - firsts) / firsts * 100)[usable]
+        change_pct = change_pct.sort_values(ascending=ascending).head(top_n)
+
+        return [
+            {
+                "market_name": market,
+                "price_change_pct": round(pct, 2),
+                "first_price": round(firsts[market], 2),
+                "last_price": round(lasts[market], 2)
+            }
+            for market, pct in change_pct.items()
+        ]
 
     else:
         return []
@@ -249,6 +278,20 @@ def get_top_markets_by_metric(
     return result
 
 
+def compute_trend_direction(series: List[Dict]) -> Optional[str]:
+    """기간 첫/끝 가격으로 추세 방향 판정 (O(1))"""
+    if len(series) >= 2:
+        first_price = series[0].get("price")
+        last_price = series[-1].get("price")
+        if first_price and last_price:
+            if last_price > first_price * 1.05:
+                return "상승"
+            elif last_price < first_price * 0.95:
+                return "하락"
+            return "보합"
+    return None
+
+
 def enrich_summary_with_context(summary: Dict, filters: Dict, series: List[Dict]) -> Dict:
     """
     summary에 추가 컨텍스트 정보 추가
@@ -270,15 +313,8 @@ def enrich_summary_with_context(summary: Dict, filters: Dict, series: List[Dict]
         enriched["anomalies"] = anomalies[:3]  # 상위 3개만
 
     # 추세 방향
-    if len(series) >= 2:
-        first_price = series[0].get("price")
-        last_price = series[-1].get("price")
-        if first_price and last_price:
-            if last_price > first_price * 1.05:
-                enriched["trend_direction"] = "상승"
-            elif last_price < first_price * 0.95:
-                enriched["trend_direction"] = "하락"
-            else:
-                enriched["trend_direction"] = "보합"
+    trend = compute_trend_direction(series)
+    if trend is not None:
+        enriched["trend_direction"] = trend
 
     return enriched
@@ -5,9 +5,15 @@
 """
 import os
 import json
+from functools import lru_cache
 from typing import Dict, List, Optional
 
-import boto3
+
+# orjson(C 구현)이 있으면 Bedrock 응답 파싱이 수 배 빠름; 없으면 stdlib json 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Bedrock 클라이언트
 _bedrock_client = None
@@ -15,8 +21,21 @@ _bedrock_client = None
 def get_bedrock_client():
     global _bedrock_client
     if _bedrock_client is None:
+        # boto3는 실제 Bedrock 호출이 필요할 때만 임포트
+        # (규칙 기반 경로만 쓰는 프로세스의 임포트 시간 ~200ms 절약)
+        import boto3
+        from botocore.config import Config
+
+        # 커넥션 풀 확대 + keep-alive로 warm 호출 시 TLS 핸드셰이크 재발생 방지
+        config = Config(
+            max_pool_connections=50,
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 3},
+            connect_timeout=2,
+            read_timeout=30
+        )
         region = os.environ.get("AWS_REGION", "ap-southeast-2")
-        _bedrock_client = boto3.client("bedrock-runtime", region_name=region)
+        _bedrock_client = boto3.client("bedrock-runtime", region_name=region, config=config)
     return _bedrock_client
 
 
@@ -70,8 +89,26 @@ FALLBACK_NARRATIVE = """📊 {item_name}{variety_suffix} 분석 결과{market_su
 # 데이터 준비 함수
 # ============================================================
 
+# 직전 요청과 같은 입력에 대한 텍스트 블록 재사용 (차트 리렌더 시 같은 프롬프트 반복 조립 방지)
+# (key, text)를 한 슬롯에 튜플로 저장 — 워커 스레드에서 동시 호출돼도
+# 읽기/쓰기가 각각 단일 대입이라 남의 키에 남의 텍스트가 섞이지 않음
+_SUMMARY_TEXT_CACHE = {"entry": None}
+_RECENT_DATA_CACHE = {"entry": None}
+
+
 def prepare_summary_text(summary: Dict) -> str:
-    """요약 통계를 텍스트로 변환"""
+    """요약 통계를 텍스트로 변환 (사용하는 필드가 같으면 직전 결과 재사용)"""
+    # 아래 조립에 쓰이는 필드 전체가 키이므로 오탐 없음
+    key = (
+        summary.get("latest_price"), summary.get("latest_volume"),
+        summary.get("wow_price_pct"), summary.get("mom_price_pct"),
+        summary.get("volatility_14d"), summary.get("data_points"),
+        summary.get("missing_rate")
+    )
+    cached = _SUMMARY_TEXT_CACHE["entry"]
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
     lines = []
 
     if summary.get("latest_price"):
@@ -97,14 +134,22 @@ def prepare_summary_text(summary: Dict) -> str:
     if summary.get("missing_rate") is not None:
         lines.append(f"- 결측치 비율: {summary['missing_rate'] * 100:.1f}%")
 
-    return "\n".join(lines) if lines else "요약 통계 없음"
+    text = "\n".join(lines) if lines else "요약 통계 없음"
+    _SUMMARY_TEXT_CACHE["entry"] = (key, text)
+    return text
 
 
 def prepare_recent_data(series: List[Dict], limit: int = 20) -> str:
-    """최근 데이터를 텍스트로 변환"""
+    """최근 데이터를 텍스트로 변환 (같은 시리즈 꼬리면 직전 결과 재사용)"""
     if not series:
         return "데이터 없음"
 
+    last = series[-1]
+    key = (len(series), last.get("date"), last.get("price"), last.get("volume"), limit)
+    cached = _RECENT_DATA_CACHE["entry"]
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
     # 최근 N개 포인트만 선택
     recent = series[-limit:] if len(series) > limit else series
 
@@ -120,42 +165,81 @@ def prepare_recent_data(series: List[Dict], limit: int = 20) -> str:
         else:
             lines.append(f"{date}: 가격 {price}원/kg, 반입량 {volume}kg")
 
-    return "\n".join(lines)
+    text = "\n".join(lines)
+    _RECENT_DATA_CACHE["entry"] = (key, text)
+    return text
 
 
 # ============================================================
 # Nova 호출
 # ============================================================
 
+# 요청 본문의 불변 부분은 모듈 로드 시 한 번만 구성 (호출마다 dict 재생성 방지)
+_DEFAULT_INFERENCE_CONFIG = {"maxTokens": 512, "temperature": 0.3}
+
+# latency-optimized 추론 경로 지원 여부 (미지원 리전/모델이면 첫 호출에서 False로 내려감)
+_latency_optimized_ok = True
+
+
+def _invoke_model(client, body: str):
+    """invoke_model 래퍼: 가능하면 latency-optimized 경로로 호출"""
+    global _latency_optimized_ok
+
+    if _latency_optimized_ok:
+        from botocore.exceptions import ClientError, ParamValidationError
+        try:
+            return client.invoke_model(
+                modelId=MODEL_ID,
+                body=body,
+                contentType="application/json",
+                accept="application/json",
+                performanceConfigLatency="optimized"
+            )
+        except ParamValidationError:
+            # 구버전 SDK: 파라미터 자체를 모름
+            _latency_optimized_ok = False
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ValidationException":
+                raise
+            # 모델/리전이 latency-optimized를 지원하지 않음
+            _latency_optimized_ok = False
+
+    return client.invoke_model(
+        modelId=MODEL_ID,
+        body=body,
+        contentType="application/json",
+        accept="application/json"
+    )
+
+
+
+@lru_cache(maxsize=256)
 def call_llm_for_narrative(prompt: str, max_tokens: int = 512) -> str:
-    """Bedrock Nova 호출하여 narrative 생성"""
+    """
+    Bedrock Nova 호출하여 narrative 생성
+    - 같은 (prompt, max_tokens) 재호출은 메모이즈 (네트워크 왕복/과금 제거)
+    - 예외는 그대로 전파 (일시 오류가 캐시에 영구 저장되지 않도록 호출부에서 처리)
+    """
     client = get_bedrock_client()
 
+    if max_tokens == 512:
+        inference_config = _DEFAULT_INFERENCE_CONFIG
+    else:
+        inference_config = {"maxTokens": max_tokens, "temperature": 0.3}
+
     body = {
         "messages": [
             {"role": "user", "content": [{"text": prompt}]}
         ],
-        "inferenceConfig": {
-            "maxTokens": max_tokens,
-            "temperature": 0.3
-        }
+        "inferenceConfig": inference_config
     }
 
-    try:
-        response = client.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(body),
-            contentType="application/json",
-            accept="application/json"
-        )
+    response = _invoke_model(client, json.dumps(body))
 
-        result = json.loads(response["body"].read())
-        output_text = result.get("output", {}).get("message", {}).get("content", [{}])[0].get("text", "")
-        return output_text.strip()
-
-    except Exception as e:
-        # 에러 시 fallback 반환
-        return f"분석 생성 중 오류가 발생했습니다: {str(e)}"
+    raw = response["body"].read()
+    result = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    output_text = result.get("output", {}).get("message", {}).get("content", [{}])[0].get("text", "")
+    return output_text.strip()
 
 
 # ============================================================
@@ -200,8 +284,11 @@ def generate_narrative(
         recent_data=prepare_recent_data(series, limit=20)
     )
 
-    # Claude 호출
-    narrative = call_llm_for_narrative(prompt)
+    # Claude 호출 (실패는 캐시 밖에서 처리 — 스로틀 등 일시 오류가 메모이즈되지 않음)
+    try:
+        narrative = call_llm_for_narrative(prompt)
+    except Exception as e:
+        return f"분석 생성 중 오류가 발생했습니다: {str(e)}"
 
     # 빈 응답이면 fallback
     if not narrative or len(narrative) < 20:
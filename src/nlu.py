@@ -7,12 +7,18 @@ NLU 모듈: Bedrock Titan 기반 자연어 → 필터 JSON 변환
 import os
 import re
 import json
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, List, Union
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
-import boto3
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
+
+# orjson(C 구현)이 있으면 Bedrock 응답 파싱/본문 직렬화가 수 배 빠름; 없으면 stdlib json 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .schema import (
     FilterRequest, NLUFiltersOutput, NLUClarifyOutput,
@@ -23,14 +29,30 @@ from .data_loader import (
     get_default_date_range, get_data_date_range
 )
 
+# 검증기는 모듈 로드 시 한 번만 구성해 재사용 (호출마다 코어 스키마 재탐색 방지)
+_FILTER_ADAPTER = TypeAdapter(FilterRequest)
+
 # Bedrock 클라이언트
 _bedrock_client = None
 
 def get_bedrock_client():
     global _bedrock_client
     if _bedrock_client is None:
+        # boto3는 실제 Bedrock 호출이 필요할 때만 임포트
+        # (규칙 기반 경로만 쓰는 프로세스의 임포트 시간 ~200ms 절약)
+        import boto3
+        from botocore.config import Config
+
+        # 커넥션 풀 확대 + keep-alive로 warm 호출 시 TLS 핸드셰이크 재발생 방지
+        config = Config(
+            max_pool_connections=50,
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 3},
+            connect_timeout=2,
+            read_timeout=30
+        )
         region = os.environ.get("AWS_REGION", "ap-southeast-2")
-        _bedrock_client = boto3.client("bedrock-runtime", region_name=region)
+        _bedrock_client = boto3.client("bedrock-runtime", region_name=region, config=config)
     return _bedrock_client
 
 
@@ -95,6 +117,28 @@ CLARIFICATION TRIGGERS:
 - Multiple matching items/varieties → ask to confirm"""
 
 
+# 포맷된 시스템 프롬프트 캐시: 차원 목록/날짜 범위는 데이터 리로드 전까지 불변이므로
+# 큰 템플릿 문자열 포맷팅을 요청마다 반복하지 않음
+_SYSTEM_CACHE = {"key": None, "text": None}
+
+
+def _format_system_prompt(dim_dict: Dict, date_range: Tuple, today_str: str) -> str:
+    key = (date_range[0], date_range[1], today_str)
+    if _SYSTEM_CACHE["key"] == key:
+        return _SYSTEM_CACHE["text"]
+
+    text = SYSTEM_PROMPT.format(
+        item_names=", ".join(dim_dict["item_names"][:30]),  # 너무 길면 자르기
+        variety_names=", ".join(dim_dict["variety_names"][:50]),
+        market_names=", ".join(dim_dict["market_names"][:20]),
+        date_range=f"{date_range[0]} ~ {date_range[1]}",
+        today=today_str  # 데이터 마지막 날짜를 기준으로 사용
+    )
+    _SYSTEM_CACHE["key"] = key
+    _SYSTEM_CACHE["text"] = text
+    return text
+
+
 USER_PROMPT_TEMPLATE = """Convert this question to JSON filter:
 "{question}"
 
@@ -113,6 +157,25 @@ Please try again. Output ONLY valid JSON for this question:
 # 날짜 표현 파싱
 # ============================================================
 
+# 요청마다 re 모듈 내부 캐시 조회/해시를 거치지 않도록 모듈 로드 시 한 번만 컴파일
+# 날짜 표현은 단일 교대(alternation) 패턴으로 묶어 입력을 한 번만 스캔
+# (우선순위는 위치가 아닌 패턴 순서 — finditer로 전 매칭을 보고 아래 순위표로 선택)
+_DATE_RE = re.compile(
+    r"최근\s*(?P<months>\d+)\s*개월"
+    r"|최근\s*(?P<days>\d+)\s*일"
+    r"|(?P<hanmonth>최근\s*(?:한\s*)?달)"
+    r"|최근\s*(?P<weeks>\d+)\s*주"
+    r"|(?P<year>\d{4})년"
+)
+# 기존 순차 검사(개월 → 일 → 한달 → 주 → 년도)의 우선순위
+_DATE_GROUP_RANK = {"months": 0, "days": 1, "hanmonth": 2, "weeks": 3, "year": 4}
+# 코드펜스 제거 + JSON 본문 탐색을 한 번의 스캔으로 (펜스가 없으면 탐욕적 중괄호 매칭)
+_RE_JSON_EXTRACT = re.compile(r"```(?:json)?\s*(\{.*\})\s*```|(\{.*\})", re.DOTALL)
+_RE_JSON_BLOCK = re.compile(r"\{.*\}", re.DOTALL)
+_RE_RECENT_WORD = re.compile(r"요즘|요새")
+_RE_PERIOD_NUM = re.compile(r"\d+\s*(개월|일|주|년)")
+_RE_EXPENSIVE = re.compile(r"비싼|비싸|싼|저렴")
+
 def parse_date_expression(text: str, today: datetime = None) -> Tuple[Optional[str], Optional[str]]:
     """
     자연어 날짜 표현을 (date_from, date_to) 튜플로 변환
@@ -131,43 +194,49 @@ def parse_date_expression(text: str, today: datetime = None) -> Tuple[Optional[s
         else:
             today = datetime.now()
 
-    # 최근 N개월
-    match = re.search(r"최근\s*(\d+)\s*개월", text)
+    # 상대/절대 날짜 표현을 한 번의 스캔으로 모두 찾고, 위치가 아니라
+    # 기존 순차 검사와 같은 패턴 우선순위로 선택
+    # (예: "2019년 가격과 최근 3개월 추세"는 최근 3개월이 이김)
+    match = None
+    best_rank = len(_DATE_GROUP_RANK)
+    for m in _DATE_RE.finditer(text):
+        rank = _DATE_GROUP_RANK[m.lastgroup]
+        if rank < best_rank:
+            match, best_rank = m, rank
+            if best_rank == 0:
+                break
     if match:
-        months = int(match.group(1))
-        date_from = today - relativedelta(months=months)
-        return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        group = match.lastgroup
 
-    # 최근 N일
-    match = re.search(r"최근\s*(\d+)\s*일", text)
-    if match:
-        days = int(match.group(1))
-        date_from = today - timedelta(days=days)
-        return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        if group == "months":
+            months = int(match.group("months"))
+            date_from = today - relativedelta(months=months)
+            return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
 
-    # 최근 한달/한 달
-    if re.search(r"최근\s*(한\s*)?달", text):
-        date_from = today - relativedelta(months=1)
-        return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        if group == "days":
+            days = int(match.group("days"))
+            date_from = today - timedelta(days=days)
+            return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
 
-    # 최근 N주
-    match = re.search(r"최근\s*(\d+)\s*주", text)
-    if match:
-        weeks = int(match.group(1))
-        date_from = today - timedelta(weeks=weeks)
-        return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        if group == "hanmonth":
+            date_from = today - relativedelta(months=1)
+            return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
 
-    # 작년
+        if group == "weeks":
+            weeks = int(match.group("weeks"))
+            date_from = today - timedelta(weeks=weeks)
+            return (date_from.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+
+        # group == "year": "작년"이 함께 있으면 기존 우선순위(작년 > 특정 년도) 유지
+        if "작년" not in text:
+            year = match.group("year")
+            return (f"{year}-01-01", f"{year}-12-31")
+
+    # 작년 (C 레벨 부분 문자열 검사가 정규식보다 빠름)
     if "작년" in text:
         last_year = today.year - 1
         return (f"{last_year}-01-01", f"{last_year}-12-31")
 
-    # 특정 년도
-    match = re.search(r"(\d{4})년", text)
-    if match:
-        year = match.group(1)
-        return (f"{year}-01-01", f"{year}-12-31")
-
     # 전월/전달 대비
     if "전월" in text or "전달" in text:
         # 비교 분석용이므로 최근 2개월
@@ -181,69 +250,112 @@ def parse_date_expression(text: str, today: datetime = None) -> Tuple[Optional[s
 # 룰 기반 Fallback
 # ============================================================
 
-def rule_based_fallback(question: str) -> Tuple[Dict, List[str]]:
+# 차원 이름 전체를 하나의 교대 정규식으로 묶어 질문을 C 레벨 단일 패스로 스캔
+# (이름별 Python `in` 루프의 O(이름 수 × 질문 길이) 제거; dim_dict가 리로드되기
+# 전까지 같은 리스트 객체이므로 컴파일 결과를 재사용)
+_NAME_MATCHER_CACHE: Dict[str, tuple] = {}
+
+# 하드코딩 흔한 품목 fallback도 같은 방식의 고정 패턴으로
+_COMMON_ITEM_RE = re.compile("감자|사과|배추|양파|마늘|대파|무")
+
+# chart_type/intent 키워드도 한 번의 스캔으로 수집 (긴 키워드를 앞에 둬서
+# '변동성'/'급등락'이 '변동'/'급등'보다 먼저 매칭되게 함; 포함 관계는 태그로 보존)
+_TAG_RE = re.compile("시장별|비교|변동성|급등락|반입량|가격|비싼|비싸|올랐|상승|변동|급등|급락")
+_TAG_MAP = {
+    "비교": ("chart_compare",), "시장별": ("chart_compare",),
+    "변동성": ("chart_volatility", "intent_volatility"),
+    "급등락": ("chart_volatility", "intent_volatility"),
+    "반입량": ("kw_volume",), "가격": ("kw_price",),
+    "비싼": ("intent_avg_price",), "비싸": ("intent_avg_price",),
+    "올랐": ("intent_change",), "상승": ("intent_change",),
+    "변동": ("intent_volatility",), "급등": ("intent_volatility",), "급락": ("intent_volatility",),
+}
+
+
+def _get_name_matcher(kind: str, names: List[str], min_len: int = 1):
+    cached = _NAME_MATCHER_CACHE.get(kind)
+    if cached is not None and cached[0] is names:
+        return cached[1]
+
+    # 긴 이름을 앞에 나열해 같은 위치에서는 최장 일치가 선택되게 함
+    parts = [re.escape(n) for n in sorted(names, key=len, reverse=True) if len(n) >= min_len]
+    matcher = re.compile("|".join(parts)) if parts else None
+    _NAME_MATCHER_CACHE[kind] = (names, matcher)
+    return matcher
+
+
+def rule_based_fallback(
+    question: str,
+    dim_dict: Optional[Dict] = None,
+    today: Optional[datetime] = None
+) -> Tuple[Dict, List[str]]:
     """
     LLM 실패 시 룰 기반으로 필터 추출
+    - dim_dict/today: 호출자(parse)가 이미 조회한 값을 넘기면 재조회 생략
     """
     warnings = ["LLM 파싱 실패로 규칙 기반 추출을 사용했습니다."]
-    dim_dict = get_dim_dict()
+    if dim_dict is None:
+        dim_dict = get_dim_dict()
 
     # 품목 매칭
     item_name = None
-    for item in dim_dict["item_names"]:
-        if item in question:
-            item_name = item
-            break
+    item_matcher = _get_name_matcher("item", dim_dict["item_names"])
+    match = item_matcher.search(question) if item_matcher else None
+    if match:
+        item_name = match.group()
 
     if not item_name:
         # fallback to most common items
-        common_items = ["감자", "사과", "배추", "양파", "마늘", "대파", "무"]
-        for item in common_items:
-            if item in question:
-                item_name = item
-                break
+        match = _COMMON_ITEM_RE.search(question)
+        if match:
+            item_name = match.group()
 
     if not item_name:
         item_name = "감자"  # 기본값
         warnings.append("품목을 찾을 수 없어 '감자'로 설정했습니다.")
 
-    # 품종 매칭
+    # 품종 매칭 (1글자 품종 제외)
     variety_name = None
-    for variety in dim_dict["variety_names"]:
-        if variety in question and len(variety) > 1:  # 1글자 품종 제외
-            variety_name = variety
-            break
+    variety_matcher = _get_name_matcher("variety", dim_dict["variety_names"], min_len=2)
+    match = variety_matcher.search(question) if variety_matcher else None
+    if match:
+        variety_name = match.group()
 
     # 시장 매칭
     market_name = "전국도매시장"
-    for market in dim_dict["market_names"]:
-        if market in question:
-            market_name = market
-            break
+    market_matcher = _get_name_matcher("market", dim_dict["market_names"])
+    match = market_matcher.search(question) if market_matcher else None
+    if match:
+        market_name = match.group()
 
     # 날짜 파싱
-    date_from, date_to = parse_date_expression(question)
+    date_from, date_to = parse_date_expression(question, today)
     if not date_from:
         date_from, date_to = get_default_date_range(90)
         warnings.append("기간을 찾을 수 없어 최근 90일로 설정했습니다.")
 
-    # chart_type 추론
-    chart_type = "trend"
-    if "비교" in question or "시장별" in question:
+    # chart_type/intent 추론: 키워드별 개별 `in` 스캔 대신 한 번의 스캔으로 태그 수집
+    tags = set()
+    for keyword in _TAG_RE.findall(question):
+        tags.update(_TAG_MAP[keyword])
+
+    if "chart_compare" in tags:
         chart_type = "compare_markets"
-    elif "변동성" in question or "급등락" in question:
+    elif "chart_volatility" in tags:
         chart_type = "volatility"
-    elif "반입량" in question and "가격" in question:
+    elif "kw_volume" in tags and "kw_price" in tags:
         chart_type = "volume_price"
+    else:
+        chart_type = "trend"
 
-    # intent 추론
-    intent = "normal"
-    if "비싼" in question or "비싸" in question:
+    if "intent_avg_price" in tags:
         intent = "high_avg_price"
-    elif "올랐" in question or "상승" in question:
+    elif "intent_change" in tags:
         intent = "high_price_change"
-    elif "변동" in question or "급등" in question or "급락" in question:
+    elif "intent_volatility" in tags:
         intent = "high_volatility"
+    else:
+        intent = "normal"
 
     filters = {
         "item_name": item_name,
@@ -267,51 +379,95 @@ def rule_based_fallback(question: str) -> Tuple[Dict, List[str]]:
 # Bedrock Nova 호출
 # ============================================================
 
+# 요청 본문의 불변 부분은 모듈 로드 시 한 번만 구성 (호출마다 dict 재생성 방지)
+_DEFAULT_INFERENCE_CONFIG = {"maxTokens": 1024, "temperature": 0.1}
+
+# latency-optimized 추론 경로 지원 여부 (미지원 리전/모델이면 첫 호출에서 False로 내려감)
+_latency_optimized_ok = True
+
+
+def _invoke_model(client, body: str):
+    """invoke_model 래퍼: 가능하면 latency-optimized 경로로 호출"""
+    global _latency_optimized_ok
+
+    if _latency_optimized_ok:
+        from botocore.exceptions import ClientError, ParamValidationError
+        try:
+            return client.invoke_model(
+                modelId=MODEL_ID,
+                body=body,
+                contentType="application/json",
+                accept="application/json",
+                performanceConfigLatency="optimized"
+            )
+        except ParamValidationError:
+            # 구버전 SDK: 파라미터 자체를 모름
+            _latency_optimized_ok = False
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ValidationException":
+                raise
+            # 모델/리전이 latency-optimized를 지원하지 않음
+            _latency_optimized_ok = False
+
+    return client.invoke_model(
+        modelId=MODEL_ID,
+        body=body,
+        contentType="application/json",
+        accept="application/json"
+    )
+
+
+
+@lru_cache(maxsize=512)
 def call_llm(prompt: str, max_tokens: int = 1024) -> str:
-    """Bedrock Nova 모델 호출"""
+    """
+    Bedrock Nova 모델 호출
+    - 같은 (prompt, max_tokens) 재호출은 메모이즈 (네트워크 왕복/과금 제거;
+      temperature가 0.1로 고정이라 응답을 재사용해도 무방)
+    """
     client = get_bedrock_client()
 
+    if max_tokens == 1024:
+        inference_config = _DEFAULT_INFERENCE_CONFIG
+    else:
+        inference_config = {"maxTokens": max_tokens, "temperature": 0.1}
+
     body = {
         "messages": [
             {"role": "user", "content": [{"text": prompt}]}
         ],
-        "inferenceConfig": {
-            "maxTokens": max_tokens,
-            "temperature": 0.1
-        }
+        "inferenceConfig": inference_config
     }
 
-    response = client.invoke_model(
-        modelId=MODEL_ID,
-        body=json.dumps(body),
-        contentType="application/json",
-        accept="application/json"
-    )
+    payload = orjson.dumps(body) if orjson is not None else json.dumps(body)
+    response = _invoke_model(client, payload)
 
-    result = json.loads(response["body"].read())
+    raw = response["body"].read()
+    result = orjson.loads(raw) if orjson is not None else json.loads(raw)
     output_text = result.get("output", {}).get("message", {}).get("content", [{}])[0].get("text", "")
     return output_text.strip()
 
 
 def extract_json_from_response(text: str) -> Optional[dict]:
     """응답에서 JSON 추출"""
-    # 코드 블록 제거
-    text = re.sub(r"```json\s*", "", text)
-    text = re.sub(r"```\s*", "", text)
-    text = text.strip()
+    # 펜스 제거용 sub 2회 + 재탐색 대신 한 번의 스캔으로 JSON 본문 추출
+    match = _RE_JSON_EXTRACT.search(text)
+    if not match:
+        return None
 
-    # JSON 파싱 시도
+    loads = orjson.loads if orjson is not None else json.loads
+    body = match.group(1) or match.group(2)
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return loads(body)
+    except ValueError:  # json.JSONDecodeError/orjson.JSONDecodeError 공통 상위
         pass
 
-    # { } 사이의 JSON 찾기
-    match = re.search(r"\{.*\}", text, re.DOTALL)
+    # 펜스 안 본문이 깨진 경우: 전체에서 탐욕적 중괄호 매칭으로 한 번 더 시도
+    match = _RE_JSON_BLOCK.search(text)
     if match:
         try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
+            return loads(match.group())
+        except ValueError:
             pass
 
     return None
@@ -345,10 +501,14 @@ def parse(
     date_range = get_data_date_range()
     today = datetime.now()
 
+    # 데이터 마지막 날짜 (상대 날짜 표현의 기준; 아래 분기들이 공유)
+    data_max_date = date_range[1] if date_range[1] else today.strftime("%Y-%m-%d")
+    data_max_dt = datetime.strptime(data_max_date, "%Y-%m-%d")
+
     # Clarification 답변이 있으면 병합 처리
     if clarify_answers:
-        # 먼저 룰 기반으로 기본 필터 추출
-        base_filters, base_warnings = rule_based_fallback(question)
+        # 먼저 룰 기반으로 기본 필터 추출 (이미 조회한 dim_dict/기준일 재사용)
+        base_filters, base_warnings = rule_based_fallback(question, dim_dict, data_max_dt)
         warnings.extend(base_warnings)
 
         # clarify_answers 적용
@@ -381,22 +541,13 @@ def parse(
         return {"type": "filters", "filters": base_filters}, warnings
 
     # ✅ 핵심 수정: Bedrock 호출 전에 날짜를 미리 계산
-    data_max_date = date_range[1] if date_range[1] else today.strftime("%Y-%m-%d")
-    data_max_dt = datetime.strptime(data_max_date, "%Y-%m-%d")
-    
     # 질문에서 날짜 표현 미리 파싱
     pre_parsed_dates = parse_date_expression(question, data_max_dt)
     date_hint = ""
     if pre_parsed_dates[0] and pre_parsed_dates[1]:
         date_hint = f"\n\nPRE-CALCULATED DATES for this query:\n- date_from: {pre_parsed_dates[0]}\n- date_to: {pre_parsed_dates[1]}\n(Use these exact dates in your response)"
     
-    system = SYSTEM_PROMPT.format(
-        item_names=", ".join(dim_dict["item_names"][:30]),  # 너무 길면 자르기
-        variety_names=", ".join(dim_dict["variety_names"][:50]),
-        market_names=", ".join(dim_dict["market_names"][:20]),
-        date_range=f"{date_range[0]} ~ {date_range[1]}",
-        today=data_max_date  # 데이터 마지막 날짜를 기준으로 사용
-    )
+    system = _format_system_prompt(dim_dict, date_range, data_max_date)
 
     user_prompt = USER_PROMPT_TEMPLATE.format(question=question) + date_hint
     full_prompt = f"{system}\n\n{user_prompt}"
@@ -426,8 +577,7 @@ def parse(
                 # 필터 검증
                 filters_data = parsed.get("filters", {})
                 try:
-                    filter_obj = FilterRequest(**filters_data)
-                    filters_dict = filter_obj.model_dump()
+                    filters_dict = _FILTER_ADAPTER.validate_python(filters_data).model_dump()
 
                     # 추가 검증/보정
                     corrected, corr_warnings = validate_and_correct_filter(
@@ -470,12 +620,144 @@ def parse(
             continue
 
     # 모든 재시도 실패 → 룰 기반 fallback
-    fallback_filters, fallback_warnings = rule_based_fallback(question)
+    fallback_filters, fallback_warnings = rule_based_fallback(question, dim_dict, data_max_dt)
     warnings.extend(fallback_warnings)
 
     return {"type": "filters", "filters": fallback_filters}, warnings
 
 
+# ============================================================
+# 배치 파싱 (백필/평가용)
+# ============================================================
+
+def parse_many(
+    questions: List[str],
+    poll_interval: int = 30,
+    timeout: int = 3600
+) -> List[Tuple[Dict, List[str]]]:
+    """
+    여러 질문을 Bedrock 배치 추론 잡으로 한 번에 필터로 변환
+    - 대화형 경로(parse)와 달리 질문당 invoke_model을 보내지 않고
+      JSONL 매니페스트를 S3에 올려 create_model_invocation_job으로 처리
+      (요청/인증 고정 비용을 배치 전체로 분산; 백필·평가 워크로드용)
+    - NLU_BATCH_BUCKET/NLU_BATCH_ROLE_ARN 환경변수가 없으면
+      질문별 parse() 순차 호출로 동작 (결과 형태 동일)
+    """
+    bucket = os.environ.get("NLU_BATCH_BUCKET")
+    role_arn = os.environ.get("NLU_BATCH_ROLE_ARN")
+
+    if not bucket or not role_arn:
+        return [parse(q) for q in questions]
+
+    import time
+    import uuid
+    import boto3
+
+    region = os.environ.get("AWS_REGION", "ap-southeast-2")
+    s3 = boto3.client("s3", region_name=region)
+    bedrock = boto3.client("bedrock", region_name=region)
+
+    dim_dict = get_dim_dict()
+    date_range = get_data_date_range()
+    data_max_date = date_range[1] or datetime.now().strftime("%Y-%m-%d")
+    system = _format_system_prompt(dim_dict, date_range, data_max_date)
+
+    # 입력 매니페스트(JSONL) 구성/업로드
+    job_id = uuid.uuid4().hex[:12]
+    input_key = f"nlu-batch/{job_id}/input.jsonl"
+    output_prefix = f"nlu-batch/{job_id}/output/"
+
+    records = []
+    for i, question in enumerate(questions):
+        prompt = f"{system}\n\n" + USER_PROMPT_TEMPLATE.format(question=question)
+        records.append(json.dumps({
+            "recordId": str(i),
+            "modelInput": {
+                "messages": [{"role": "user", "content": [{"text": prompt}]}],
+                "inferenceConfig": _DEFAULT_INFERENCE_CONFIG
+            }
+        }, ensure_ascii=False))
+    s3.put_object(
+        Bucket=bucket, Key=input_key,
+        Body="\n".join(records).encode("utf-8")
+    )
+
+    job = bedrock.create_model_invocation_job(
+        jobName=f"nlu-batch-{job_id}",
+        modelId=MODEL_ID,
+        roleArn=role_arn,
+        inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{bucket}/{input_key}"}},
+        outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{bucket}/{output_prefix}"}}
+    )
+    job_arn = job["jobArn"]
+
+    # 완료 폴링
+    deadline = time.time() + timeout
+    while True:
+        status = bedrock.get_model_invocation_job(jobIdentifier=job_arn)["status"]
+        if status == "Completed":
+            break
+        if status in ("Failed", "Stopped", "Expired") or time.time() > deadline:
+            raise RuntimeError(f"배치 추론 잡 실패/중단: {status}")
+        time.sleep(poll_interval)
+
+    # 결과 JSONL 수집 (recordId -> 응답 텍스트)
+    outputs: Dict[str, str] = {}
+    listed = s3.list_objects_v2(Bucket=bucket, Prefix=output_prefix)
+    for obj in listed.get("Contents", []):
+        if not obj["Key"].endswith(".jsonl.out"):
+            continue
+        body = s3.get_object(Bucket=bucket, Key=obj["Key"])["Body"].read()
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = (
+                record.get("modelOutput", {})
+                .get("output", {}).get("message", {})
+                .get("content", [{}])[0].get("text", "")
+            )
+            outputs[record.get("recordId")] = text
+
+    # 질문별로 단건 경로와 동일한 추출/검증 적용
+    results = []
+    for i, question in enumerate(questions):
+        warnings: List[str] = []
+        parsed = extract_json_from_response(outputs.get(str(i), ""))
+
+        if parsed and parsed.get("type") == "filters":
+            try:
+                filters_dict = _FILTER_ADAPTER.validate_python(parsed.get("filters", {})).model_dump()
+                corrected, corr_warnings = validate_and_correct_filter(
+                    filters_dict.get("item_name", ""),
+                    filters_dict.get("variety_name"),
+                    filters_dict.get("market_name")
+                )
+                warnings.extend(corr_warnings)
+                filters_dict.update(corrected)
+                results.append(({"type": "filters", "filters": filters_dict}, warnings))
+                continue
+            except ValidationError:
+                pass
+
+        if parsed and parsed.get("type") == "clarify":
+            results.append((
+                {
+                    "type": "clarify",
+                    "draft_filters": parsed.get("draft_filters", {}),
+                    "questions": parsed.get("questions", [])
+                },
+                parsed.get("warnings", [])
+            ))
+            continue
+
+        fallback_filters, fallback_warnings = rule_based_fallback(question, dim_dict)
+        warnings.extend(fallback_warnings)
+        results.append(({"type": "filters", "filters": fallback_filters}, warnings))
+
+    return results
+
+
 # ============================================================
 # 애매함 감지 함수
 # ============================================================
@@ -488,7 +770,7 @@ def detect_ambiguity(question: str) -> List[Dict]:
     questions = []
 
     # "요즘/최근/요새" + 구체적 기간 없음
-    if re.search(r"요즘|요새", question) and not re.search(r"\d+\s*(개월|일|주|년)", question):
+    if _RE_RECENT_WORD.search(question) and not _RE_PERIOD_NUM.search(question):
         questions.append({
             "id": "recent_window",
             "question": "어느 기간을 기준으로 분석할까요?",
@@ -497,7 +779,7 @@ def detect_ambiguity(question: str) -> List[Dict]:
         })
 
     # "비싼/싼" 등 가격 관련 애매함
-    if re.search(r"비싼|비싸|싼|저렴", question):
+    if _RE_EXPENSIVE.search(question):
         questions.append({
             "id": "expensive_meaning",
             "question": "'비싼/싼'의 기준을 선택해주세요:",
@@ -4,14 +4,22 @@
 - intent별 처리 (high_avg_price, high_price_change, high_volatility)
 - granularity별 집계
 """
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .data_loader import load_data, get_data_date_range
+from .data_loader import load_data, get_data_date_range, get_item_indices
 from .schema import FilterRequest, SeriesPoint
 
 
+@lru_cache(maxsize=128)
+def _to_ts(date_str: str) -> pd.Timestamp:
+    """날짜 문자열 → Timestamp (같은 필터 문자열 반복 파싱 방지)"""
+    return pd.to_datetime(date_str)
+
+
 # ============================================================
 # 필터 적용
 # ============================================================
@@ -28,36 +36,47 @@ def apply_filters(df: pd.DataFrame, filters: Dict) -> Tuple[pd.DataFrame, List[s
         (filtered_df, warnings)
     """
     warnings = []
-    result = df.copy()
 
-    # 품목명 필터 (필수)
+    # 품목명 필터 (필수): 로드 시 구축된 품목별 행 위치로 바로 슬라이스
+    # (캐시된 프레임이 아닌 경우에만 전체 스캔으로 폴백)
     item_name = filters.get("item_name")
     if item_name:
-        result = result[result["item_name"] == item_name]
-        if len(result) == 0:
-            warnings.append(f"품목 '{item_name}'에 해당하는 데이터가 없습니다.")
-            return result, warnings
-
-    # 품종명 필터 (선택)
+        if df is load_data():
+            positions = get_item_indices().get(item_name)
+            if positions is None or len(positions) == 0:
+                warnings.append(f"품목 '{item_name}'에 해당하는 데이터가 없습니다.")
+                return df.iloc[0:0], warnings
+            df = df.take(positions)
+        else:
+            item_mask = (df["item_name"] == item_name).to_numpy()
+            if not item_mask.any():
+                warnings.append(f"품목 '{item_name}'에 해당하는 데이터가 없습니다.")
+                return df.loc[item_mask], warnings
+            df = df.loc[item_mask]
+
+    # 이후 필터는 품목으로 줄어든 슬라이스 위에서 불리언 마스크를 결합해
+    # 마지막에 한 번만 추출
+    mask = np.ones(len(df), dtype=bool)
+
+    # 품종명 필터 (선택; 비면 직전 마스크 유지 = 품목 전체로 대체)
     variety_name = filters.get("variety_name")
     if variety_name:
-        result = result[result["variety_name"] == variety_name]
-        if len(result) == 0:
+        narrowed = mask & (df["variety_name"] == variety_name).to_numpy()
+        if narrowed.any():
+            mask = narrowed
+        else:
             warnings.append(f"품종 '{variety_name}'에 해당하는 데이터가 없어 전체로 대체합니다.")
-            result = df[df["item_name"] == item_name]
 
-    # 시장명 필터 (선택)
+    # 시장명 필터 (선택; compare_markets가 아닌 경우에만 적용, 비면 직전 마스크 유지)
     market_name = filters.get("market_name")
     chart_type = filters.get("chart_type", "trend")
 
-    # compare_markets가 아닌 경우에만 시장 필터 적용
     if market_name and chart_type != "compare_markets":
-        result = result[result["market_name"] == market_name]
-        if len(result) == 0:
+        narrowed = mask & (df["market_name"] == market_name).to_numpy()
+        if narrowed.any():
+            mask = narrowed
+        else:
             warnings.append(f"시장 '{market_name}'에 해당하는 데이터가 없어 전국도매시장으로 대체합니다.")
-            result = df[df["item_name"] == item_name]
-            if variety_name:
-                result = result[result["variety_name"] == variety_name]
 
     # 날짜 범위 필터 (데이터 범위 벗어나면 자동 보정)
     date_from = filters.get("date_from")
@@ -65,17 +84,17 @@ def apply_filters(df: pd.DataFrame, filters: Dict) -> Tuple[pd.DataFrame, List[s
 
     # 데이터 범위 확인
     data_min_str, data_max_str = get_data_date_range()
-    data_min_dt = pd.to_datetime(data_min_str) if data_min_str else None
-    data_max_dt = pd.to_datetime(data_max_str) if data_max_str else None
+    data_min_dt = _to_ts(data_min_str) if data_min_str else None
+    data_max_dt = _to_ts(data_max_str) if data_max_str else None
 
     if date_from and data_max_dt:
-        date_from_dt = pd.to_datetime(date_from)
+        date_from_dt = _to_ts(date_from)
         # 요청 기간이 데이터 범위를 완전히 벗어나면 자동 보정
         if date_from_dt > data_max_dt:
             warnings.append(f"요청 기간({date_from})이 데이터 범위({data_max_str})를 벗어나 최근 데이터로 보정했습니다.")
             # 데이터 마지막 날짜 기준으로 동일한 기간만큼 앞으로 이동
             if date_to:
-                date_to_dt = pd.to_datetime(date_to)
+                date_to_dt = _to_ts(date_to)
                 period_days = (date_to_dt - date_from_dt).days
                 date_from_dt = data_max_dt - pd.Timedelta(days=period_days)
                 date_to = data_max_str
@@ -84,18 +103,19 @@ def apply_filters(df: pd.DataFrame, filters: Dict) -> Tuple[pd.DataFrame, List[s
                 date_to = data_max_str
             # 보정된 날짜를 문자열로 업데이트
             date_from = date_from_dt.strftime("%Y-%m-%d")
-        result = result[result["date"] >= date_from_dt]
+        mask &= (df["date"] >= date_from_dt).to_numpy()
     elif date_from:
         # data_max_dt가 없는 경우에도 처리
-        date_from_dt = pd.to_datetime(date_from)
-        result = result[result["date"] >= date_from_dt]
+        date_from_dt = _to_ts(date_from)
+        mask &= (df["date"] >= date_from_dt).to_numpy()
 
     if date_to and data_max_dt:
-        date_to_dt = pd.to_datetime(date_to)
+        date_to_dt = _to_ts(date_to)
         if date_to_dt > data_max_dt:
             date_to_dt = data_max_dt
-        result = result[result["date"] <= date_to_dt]
+        mask &= (df["date"] <= date_to_dt).to_numpy()
 
+    result = df.loc[mask]
     if len(result) == 0:
         warnings.append("지정된 기간에 해당하는 데이터가 없습니다.")
 
@@ -125,12 +145,14 @@ def aggregate_by_granularity(
     if len(df) == 0:
         return df
 
-    df = df.copy()
-
-    # 주간 집계를 위한 주차 컬럼 생성
+    # 주간 집계를 위한 주차 키: load_data가 미리 계산해 둔 컬럼을 그대로 사용하고,
+    # 없는 프레임(외부 구성 등)은 복사/컬럼 추가 없이 시리즈를 그룹 키로 바로 전달
     if granularity == "weekly":
-        df["week"] = df["date"].dt.to_period("W").apply(lambda x: x.start_time)
-        group_col = "week"
+        if "week" in df.columns:
+            group_col = "week"
+        else:
+            # .apply(lambda)는 행마다 Python 콜백을 호출하므로 벡터화된 .dt.start_time 사용
+            group_col = df["date"].dt.to_period("W").dt.start_time.rename("week")
     else:
         # daily: 데이터가 순(旬) 단위이므로 대표일 기준
         group_col = "date"
@@ -151,7 +173,9 @@ def aggregate_by_granularity(
     # 존재하는 컬럼만 집계
     agg_funcs = {k: v for k, v in agg_funcs.items() if k in df.columns}
 
-    result = df.groupby(group_keys, as_index=False).agg(agg_funcs)
+    # market_name이 카테고리형이라 observed=True가 없으면 기간×미관측 시장의
+    # 데카르트 행(price=NaN, volume=0)이 생김 (pandas 2.x 기본값은 False)
+    result = df.groupby(group_keys, as_index=False, observed=True).agg(agg_funcs)
 
     # date 컬럼 정리
     if granularity == "weekly":
@@ -161,6 +185,34 @@ def aggregate_by_granularity(
     return result
 
 
+
+# ============================================================
+# 시계열 변환
+# ============================================================
+
+def _frame_to_series(aggregated: pd.DataFrame, include_market: bool = False,
+                     include_volatility: bool = False) -> List[Dict]:
+    """
+    집계 프레임 → SeriesPoint dict 리스트
+    - iterrows(행마다 셀 박싱 + dict 구성) 대신 컬럼 단위 strftime/round 후
+      to_dict(records)로 한 번에 변환 (NaN은 None으로 치환)
+    """
+    out = pd.DataFrame({
+        "date": aggregated["date"].dt.strftime("%Y-%m-%d"),
+        "price": aggregated["price_kg"].round(2) if "price_kg" in aggregated.columns else np.nan,
+        "volume": aggregated["volume_kg"].round(2) if "volume_kg" in aggregated.columns else np.nan,
+    })
+    if include_market:
+        out["market_name"] = aggregated["market_name"].astype(str)
+    else:
+        out["market_name"] = None
+    if include_volatility:
+        out["volatility"] = aggregated["volatility"].round(2)
+
+    out = out.astype(object).where(out.notna(), None)
+    return out.to_dict(orient="records")
+
+
 # ============================================================
 # chart_type별 처리
 # ============================================================
@@ -179,17 +231,7 @@ def query_trend(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[str]]
     granularity = filters.get("granularity", "weekly")
     aggregated = aggregate_by_granularity(filtered, granularity, group_by_market=False)
 
-    series = []
-    for _, row in aggregated.iterrows():
-        point = {
-            "date": row["date"].strftime("%Y-%m-%d") if pd.notna(row["date"]) else None,
-            "price": round(row["price_kg"], 2) if pd.notna(row.get("price_kg")) else None,
-            "volume": round(row["volume_kg"], 2) if pd.notna(row.get("volume_kg")) else None,
-            "market_name": None
-        }
-        series.append(point)
-
-    return series, warnings
+    return _frame_to_series(aggregated), warnings
 
 
 def query_compare_markets(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[str]]:
@@ -206,9 +248,9 @@ def query_compare_markets(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict],
     top_n = filters.get("top_n_markets", 5)
     granularity = filters.get("granularity", "weekly")
 
-    # 상위 N개 시장 선정 (거래금액 기준)
-    market_totals = filtered.groupby("market_name")["amount_krw"].sum().sort_values(ascending=False)
-    top_markets = market_totals.head(top_n).index.tolist()
+    # 상위 N개 시장 선정 (거래금액 기준; 전체 정렬 대신 크기 k 힙의 부분 정렬)
+    market_totals = filtered.groupby("market_name", sort=False, observed=True)["amount_krw"].sum()
+    top_markets = market_totals.nlargest(top_n).index.tolist()
 
     if len(top_markets) == 0:
         warnings.append("비교할 시장이 없습니다.")
@@ -217,17 +259,7 @@ def query_compare_markets(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict],
     filtered = filtered[filtered["market_name"].isin(top_markets)]
     aggregated = aggregate_by_granularity(filtered, granularity, group_by_market=True)
 
-    series = []
-    for _, row in aggregated.iterrows():
-        point = {
-            "date": row["date"].strftime("%Y-%m-%d") if pd.notna(row["date"]) else None,
-            "price": round(row["price_kg"], 2) if pd.notna(row.get("price_kg")) else None,
-            "volume": round(row["volume_kg"], 2) if pd.notna(row.get("volume_kg")) else None,
-            "market_name": row["market_name"]
-        }
-        series.append(point)
-
-    return series, warnings
+    return _frame_to_series(aggregated, include_market=True), warnings
 
 
 def query_volume_price(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[str]]:
@@ -251,26 +283,20 @@ def query_volatility(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[
     granularity = filters.get("granularity", "weekly")
     aggregated = aggregate_by_granularity(filtered, granularity, group_by_market=False)
 
-    # rolling std 계산 (4주 = 약 4포인트)
+    # rolling std 계산 (4주 = 약 4포인트; 누적합 단일 패스 헬퍼 사용)
+    # features가 이 모듈을 임포트하므로 순환 방지를 위해 함수 내부에서 임포트
+    from .features import rolling_std
+
     window = 4 if granularity == "weekly" else 14
     if len(aggregated) >= window:
-        aggregated["volatility"] = aggregated["price_kg"].rolling(window=window, min_periods=2).std()
+        aggregated["volatility"] = rolling_std(
+            aggregated["price_kg"].to_numpy(), window, min_periods=2
+        )
     else:
         aggregated["volatility"] = aggregated["price_kg"].std()
         warnings.append(f"데이터가 부족하여 전체 기간 변동성을 계산했습니다.")
 
-    series = []
-    for _, row in aggregated.iterrows():
-        point = {
-            "date": row["date"].strftime("%Y-%m-%d") if pd.notna(row["date"]) else None,
-            "price": round(row["price_kg"], 2) if pd.notna(row.get("price_kg")) else None,
-            "volume": round(row["volume_kg"], 2) if pd.notna(row.get("volume_kg")) else None,
-            "market_name": None,
-            "volatility": round(row["volatility"], 2) if pd.notna(row.get("volatility")) else None
-        }
-        series.append(point)
-
-    return series, warnings
+    return _frame_to_series(aggregated, include_volatility=True), warnings
 
 
 # ============================================================
@@ -294,8 +320,8 @@ def query_high_avg_price(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], L
 
     # 시장별 평균가격 기준으로 top_n 선정
     top_n = filters.get("top_n_markets", 5)
-    market_avg = filtered.groupby("market_name")["price_kg"].mean().sort_values(ascending=False)
-    top_markets = market_avg.head(top_n).index.tolist()
+    market_avg = filtered.groupby("market_name", sort=False, observed=True)["price_kg"].mean()
+    top_markets = market_avg.nlargest(top_n).index.tolist()
 
     if len(top_markets) == 0:
         return [], warnings
@@ -309,24 +335,14 @@ def query_high_avg_price(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], L
     date_from = filters.get("date_from")
     date_to = filters.get("date_to")
     if date_from:
-        filtered = filtered[filtered["date"] >= pd.to_datetime(date_from)]
+        filtered = filtered[filtered["date"] >= _to_ts(date_from)]
     if date_to:
-        filtered = filtered[filtered["date"] <= pd.to_datetime(date_to)]
+        filtered = filtered[filtered["date"] <= _to_ts(date_to)]
 
     granularity = filters.get("granularity", "weekly")
     aggregated = aggregate_by_granularity(filtered, granularity, group_by_market=True)
 
-    series = []
-    for _, row in aggregated.iterrows():
-        point = {
-            "date": row["date"].strftime("%Y-%m-%d") if pd.notna(row["date"]) else None,
-            "price": round(row["price_kg"], 2) if pd.notna(row.get("price_kg")) else None,
-            "volume": round(row["volume_kg"], 2) if pd.notna(row.get("volume_kg")) else None,
-            "market_name": row["market_name"]
-        }
-        series.append(point)
-
-    return series, warnings
+    return _frame_to_series(aggregated, include_market=True), warnings
 
 
 def query_high_price_change(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[str]]:
@@ -347,21 +363,19 @@ def query_high_price_change(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict]
     if len(aggregated) == 0:
         return [], warnings
 
-    # 시장별 상승률 계산
-    market_changes = []
-    for market in aggregated["market_name"].unique():
-        market_data = aggregated[aggregated["market_name"] == market].sort_values("date")
-        if len(market_data) >= 2:
-            first_price = market_data.iloc[0]["price_kg"]
-            last_price = market_data.iloc[-1]["price_kg"]
-            if first_price and first_price > 0:
-                change_pct = ((last_price - first_price) / first_price) * 100
-                market_changes.append((market, change_pct))
-
-    # 상승률 기준 정렬
-    market_changes.sort(key=lambda x: x[1], reverse=True)
+    # 시장별 상승률 계산: 시장마다 부분 프레임을 만들어 정렬하는 대신
+    # 전체를 한 번 정렬하고 시장별 첫/끝 행을 일괄 추출
+    # (drop_duplicates는 NaN을 건너뛰지 않아 기존 iloc[0]/iloc[-1] 동작과 동일)
+    sorted_agg = aggregated.sort_values("date")
+    firsts = sorted_agg.drop_duplicates("market_name", keep="first").set_index("market_name")["price_kg"]
+    lasts = sorted_agg.drop_duplicates("market_name", keep="last").set_index("market_name")["price_kg"]
+    counts = sorted_agg["market_name"].value_counts().reindex(firsts.index)
+
+    usable = (counts >= 2) & firsts.notna() & (firsts > 0)
+    change_pct = ((lasts - firsts) / firsts * 100)[usable]
+
     top_n = filters.get("top_n_markets", 5)
-    top_markets = [m[0] for m in market_changes[:top_n]]
+    top_markets = change_pct.nlargest(top_n).index.tolist()
 
     if len(top_markets) == 0:
         warnings.append("상승률을 계산할 수 있는 시장이 없습니다.")
@@ -370,17 +384,7 @@ def query_high_price_change(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict]
     filtered = aggregated[aggregated["market_name"].isin(top_markets)]
     warnings.append("가격 상승률이 높은 시장을 표시합니다.")
 
-    series = []
-    for _, row in filtered.iterrows():
-        point = {
-            "date": row["date"].strftime("%Y-%m-%d") if pd.notna(row["date"]) else None,
-            "price": round(row["price_kg"], 2) if pd.notna(row.get("price_kg")) else None,
-            "volume": round(row["volume_kg"], 2) if pd.notna(row.get("volume_kg")) else None,
-            "market_name": row["market_name"]
-        }
-        series.append(point)
-
-    return series, warnings
+    return _frame_to_series(filtered, include_market=True), warnings
 
 
 def query_high_volatility(df: pd.DataFrame, filters: Dict) -> Tuple[List[Dict], List[str]]:
@@ -4,16 +4,134 @@ pytest 설정 및 fixture
 import os
 import sys
 import pytest
+import numpy as np
 import pandas as pd
+from types import MappingProxyType
 
 # 프로젝트 루트 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+def pytest_collection_modifyitems(config, items):
+    # 스키마 전용 테스트만 선택된 실행이면 트레이스백을 한 줄로 축약
+    # (실패 시 pydantic 모델 전체 repr 렌더링 방지)
+    if config.option.tbstyle == "auto" and items and all(
+        item.get_closest_marker("schema_only") for item in items
+    ):
+        config.option.tbstyle = "line"
+
+
+@pytest.fixture(scope="session")
+def loaded_df():
+    """세션당 한 번만 로드되는 전체 데이터프레임
+    (데이터 미제공 환경에서는 빈 프레임 → data_available이 False로 판정)"""
+    from src.data_loader import load_data
+    try:
+        return load_data()
+    except (OSError, ValueError):
+        return pd.DataFrame()
+
+
+@pytest.fixture
+def mini_df():
+    """스키마/빈 결과 경로용 소형 합성 프레임 (실데이터 로드 생략)"""
+    return pd.DataFrame({
+        "date": pd.date_range("2018-01-01", periods=20, freq="W"),
+        "item_name": ["감자"] * 20,
+        "market_name": ["전국도매시장"] * 20,
+        "price_kg": np.linspace(1500, 1900, 20),
+        "volume_kg": 10000.0
+    })
+
+
+@pytest.fixture
+def patch_mini_data(mini_df, monkeypatch):
+    """query 모듈의 데이터 접근을 mini_df로 대체"""
+    monkeypatch.setattr("src.query.load_data", lambda: mini_df)
+    # 품목 행 위치 맵도 같은 프레임 기준으로 맞춰야 fast path가 일관됨
+    monkeypatch.setattr(
+        "src.query.get_item_indices",
+        lambda: mini_df.groupby("item_name", sort=False, observed=True).indices
+    )
+    return mini_df
+
+
+@pytest.fixture
+def patch_empty_data(monkeypatch):
+    """query 모듈의 데이터 접근을 빈 프레임으로 대체 (빈 입력 → 빈 출력 경로)"""
+    empty = pd.DataFrame(columns=["date", "item_name", "market_name", "price_kg", "volume_kg"])
+    monkeypatch.setattr("src.query.load_data", lambda: empty)
+    monkeypatch.setattr("src.query.get_item_indices", lambda: {})
+    return empty
+
+
+@pytest.fixture(scope="session")
+def data_available(loaded_df):
+    """데이터셋 제공 여부 (세션당 한 번 판정)"""
+    return len(loaded_df) > 0
+
+
 @pytest.fixture
+def require_data(data_available):
+    """데이터셋이 없으면 해당 테스트를 스킵"""
+    if not data_available:
+        pytest.skip("데이터셋이 제공되지 않은 환경")
+
+
+@pytest.fixture(scope="session")
+def potato_filtered(loaded_df, data_available):
+    """감자 품목으로 필터된 프레임 (세션당 스캔 한 번)"""
+    if not data_available:
+        pytest.skip("데이터셋이 제공되지 않은 환경")
+    from src.query import apply_filters
+    return apply_filters(loaded_df, {"item_name": "감자"})[0]
+
+
+@pytest.fixture(scope="session")
+def cached_execute_query(data_available):
+    """execute_query 결과를 필터 키로 세션 캐싱하는 래퍼"""
+    if not data_available:
+        pytest.skip("데이터셋이 제공되지 않은 환경")
+    import copy
+    import json
+    from src.query import execute_query
+
+    results = {}
+
+    def _run(filters):
+        key = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+        if key not in results:
+            results[key] = execute_query(filters)
+        # 테스트 간 캐시 원본 변형 방지
+        return copy.deepcopy(results[key])
+
+    return _run
+
+
+@pytest.fixture(scope="session")
+def canonical_filter_req():
+    """한 번만 검증 구성한 기준 FilterRequest (변형은 model_copy 사용)"""
+    from src.schema import FilterRequest
+    return FilterRequest(
+        item_name="감자",
+        variety_name=None,
+        market_name="전국도매시장",
+        date_from="2018-01-01",
+        date_to="2018-12-31",
+        chart_type="trend",
+        metrics=["price", "volume"],
+        granularity="weekly",
+        top_n_markets=5,
+        explain=True,
+        intent="normal",
+        window_days=30
+    )
+
+
+@pytest.fixture(scope="session")
 def sample_filters():
-    """테스트용 기본 필터"""
-    return {
+    """테스트용 기본 필터 (세션 공유; 변형이 필요하면 dict(...)로 복사)"""
+    return MappingProxyType({
         "item_name": "감자",
         "variety_name": "수미",
         "market_name": "전국도매시장",
@@ -26,13 +144,13 @@ def sample_filters():
         "explain": True,
         "intent": "normal",
         "window_days": 30
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_series():
-    """테스트용 시계열 데이터"""
-    return [
+    """테스트용 시계열 데이터 (세션 공유, 읽기 전용)"""
+    return tuple(MappingProxyType(p) for p in [
         {"date": "2018-01-05", "price": 1500.0, "volume": 10000.0, "market_name": None},
         {"date": "2018-01-15", "price": 1600.0, "volume": 12000.0, "market_name": None},
         {"date": "2018-01-25", "price": 1550.0, "volume": 11000.0, "market_name": None},
@@ -41,13 +159,13 @@ def sample_series():
         {"date": "2018-02-25", "price": 1800.0, "volume": 14000.0, "market_name": None},
         {"date": "2018-03-05", "price": 1750.0, "volume": 13500.0, "market_name": None},
         {"date": "2018-03-15", "price": 1900.0, "volume": 15000.0, "market_name": None},
-    ]
+    ])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_summary():
-    """테스트용 요약 통계"""
-    return {
+    """테스트용 요약 통계 (세션 공유, 읽기 전용)"""
+    return MappingProxyType({
         "latest_price": 1900.0,
         "latest_volume": 15000.0,
         "wow_price_pct": 8.57,
@@ -56,7 +174,7 @@ def sample_summary():
         "volatility_14d": 150.5,
         "data_points": 8,
         "missing_rate": 0.0
-    }
+    })
 
 
 @pytest.fixture
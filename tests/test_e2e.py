@@ -20,117 +20,102 @@ TEST_QUESTIONS = [
 ]
 
 
+@pytest.fixture(scope="session")
+def nlu_fallback_results(data_available):
+    """5개 질문의 fallback 필터를 세션당 한 번만 추출"""
+    if not data_available:
+        pytest.skip("데이터셋이 제공되지 않은 환경")
+    return [(q, item, rule_based_fallback(q)) for q, item in TEST_QUESTIONS]
+
+
+@pytest.mark.slow
 class TestE2ESmoke:
     """E2E 스모크 테스트"""
 
-    @pytest.mark.parametrize("question,expected_item", TEST_QUESTIONS)
-    def test_full_pipeline_with_fallback(self, question, expected_item):
+    def test_full_pipeline_with_fallback(self, nlu_fallback_results):
         """
         전체 파이프라인 테스트 (rule_based_fallback 사용)
         - 자연어 → 필터 (fallback)
         - 필터 → 데이터 조회
         - 데이터 → 요약 계산
+        - 질문 5개를 한 테스트 안에서 순회 (수집 노드 5개 → 1개,
+          실패 시 assert 메시지의 질문으로 어떤 케이스인지 식별)
         """
-        # 1. 필터 추출 (fallback 사용)
-        filters, nlu_warnings = rule_based_fallback(question)
-
-        # 품목 확인
-        assert filters["item_name"] is not None
-
-        # 필터 스키마 검증
-        try:
-            filter_obj = FilterRequest(**filters)
-            filters = filter_obj.model_dump()
-        except Exception as e:
-            pytest.fail(f"FilterRequest 검증 실패: {e}")
-
-        # 2. 데이터 조회
-        series, query_warnings = execute_query(filters)
-
-        # series가 리스트인지 확인
-        assert isinstance(series, list)
-
-        # 3. 요약 계산 (데이터가 있을 때만)
-        if series:
-            summary = calculate_summary(series, filters)
-            summary = enrich_summary_with_context(summary, filters, series)
-
-            # 요약 구조 검증
-            assert "data_points" in summary
-            assert "missing_rate" in summary
-            assert summary["data_points"] == len(series) or summary["data_points"] >= 0
-
-            # 각 series 포인트 검증
-            for point in series:
-                assert "date" in point
-                assert "price" in point or point.get("price") is None
-                assert "volume" in point or point.get("volume") is None
-
-    def test_trend_chart_response_schema(self):
-        """trend 차트 응답 스키마 검증"""
-        filters = {
-            "item_name": "감자",
-            "variety_name": None,
-            "market_name": "전국도매시장",
-            "date_from": "2018-01-01",
-            "date_to": "2018-12-31",
-            "chart_type": "trend",
-            "metrics": ["price", "volume"],
-            "granularity": "weekly",
-            "explain": True
-        }
-
-        series, warnings = execute_query(filters)
-
-        if series:
-            # 첫 번째 포인트 검증
-            point = series[0]
-            assert "date" in point
-            assert len(point["date"]) == 10  # YYYY-MM-DD
-
-    def test_compare_markets_response_schema(self):
-        """compare_markets 차트 응답 스키마 검증"""
+        for question, expected_item, (filters, nlu_warnings) in nlu_fallback_results:
+            # 품목 확인
+            assert filters["item_name"] is not None, question
+
+            # 필터 스키마 검증
+            try:
+                filter_obj = FilterRequest(**filters)
+                filters = filter_obj.model_dump()
+            except Exception as e:
+                pytest.fail(f"FilterRequest 검증 실패 ({question}): {e}")
+
+            # 2. 데이터 조회
+            series, query_warnings = execute_query(filters)
+
+            # series가 리스트인지 확인
+            assert isinstance(series, list), question
+
+            # 3. 요약 계산 (데이터가 있을 때만)
+            if series:
+                summary = calculate_summary(series, filters)
+                summary = enrich_summary_with_context(summary, filters, series)
+
+                # 요약 구조 검증
+                assert "data_points" in summary, question
+                assert "missing_rate" in summary, question
+                assert summary["data_points"] == len(series) or summary["data_points"] >= 0
+
+                # 각 series 포인트 검증
+                for point in series:
+                    assert "date" in point, question
+                    assert "price" in point or point.get("price") is None
+                    assert "volume" in point or point.get("volume") is None
+
+    # 차트 유형별 응답 스키마 케이스: (필터 오버라이드, 포인트 검증 함수)
+    CHART_SCHEMA_CASES = [
+        (
+            "trend",
+            {"market_name": "전국도매시장", "chart_type": "trend",
+             "metrics": ["price", "volume"]},
+            lambda point: "date" in point and len(point["date"]) == 10  # YYYY-MM-DD
+        ),
+        (
+            "compare_markets",
+            {"market_name": None, "chart_type": "compare_markets", "top_n_markets": 3},
+            lambda point: point.get("market_name") is not None
+        ),
+        (
+            "volatility",
+            {"market_name": "전국도매시장", "chart_type": "volatility"},
+            # volatility는 초반 window 구간에 없을 수 있어 구조만 확인
+            lambda point: "date" in point
+        ),
+    ]
+
+    @pytest.mark.parametrize(
+        "chart_type,overrides,check_point",
+        CHART_SCHEMA_CASES,
+        ids=[case[0] for case in CHART_SCHEMA_CASES]
+    )
+    def test_chart_response_schema(self, cached_execute_query, chart_type, overrides, check_point):
+        """차트 유형별 응답 스키마 검증 (공통 필터 + 유형별 오버라이드)"""
         filters = {
             "item_name": "감자",
             "variety_name": None,
-            "market_name": None,
             "date_from": "2018-01-01",
             "date_to": "2018-12-31",
-            "chart_type": "compare_markets",
-            "top_n_markets": 3,
             "granularity": "weekly",
-            "explain": True
+            "explain": True,
+            **overrides
         }
 
-        series, warnings = execute_query(filters)
+        series, warnings = cached_execute_query(filters)
 
         if series:
-            # market_name이 있어야 함
-            point = series[0]
-            assert "market_name" in point
-            assert point["market_name"] is not None
-
-    def test_volatility_response_schema(self):
-        """volatility 차트 응답 스키마 검증"""
-        filters = {
-            "item_name": "감자",
-            "variety_name": None,
-            "market_name": "전국도매시장",
-            "date_from": "2018-01-01",
-            "date_to": "2018-12-31",
-            "chart_type": "volatility",
-            "granularity": "weekly",
-            "explain": True
-        }
-
-        series, warnings = execute_query(filters)
-
-        # volatility 차트는 volatility 필드가 있을 수 있음
-        if series and len(series) > 4:
-            # 일부 포인트에 volatility가 있어야 함 (rolling 계산 후)
-            has_volatility = any(point.get("volatility") is not None for point in series)
-            # 데이터가 충분하면 volatility가 있어야 함
-            # (초반 window 기간에는 없을 수 있음)
+            assert check_point(series[0]), (chart_type, series[0])
 
 
 class TestClarifyFlow:
@@ -146,7 +131,7 @@ class TestClarifyFlow:
         # 최소 1개 이상의 질문이 있어야 함
         assert len(questions) >= 1
 
-    def test_clarify_answers_processing(self):
+    def test_clarify_answers_processing(self, require_data):
         """clarify_answers 처리"""
         clarify_answers = {
             "expensive_meaning": "high_avg_price",
@@ -163,8 +148,8 @@ class TestClarifyFlow:
 class TestErrorHandling:
     """에러 처리 테스트"""
 
-    def test_nonexistent_item(self):
-        """존재하지 않는 품목"""
+    def test_nonexistent_item(self, patch_empty_data):
+        """존재하지 않는 품목 (빈 프레임으로 실데이터 스캔 생략)"""
         filters = {
             "item_name": "존재하지않는품목xyz",
             "date_from": "2018-01-01",
@@ -180,8 +165,8 @@ class TestErrorHandling:
         # 경고가 있어야 함
         assert len(warnings) > 0
 
-    def test_invalid_date_range(self):
-        """잘못된 날짜 범위"""
+    def test_invalid_date_range(self, patch_empty_data):
+        """잘못된 날짜 범위 (빈 프레임으로 실데이터 스캔 생략)"""
         filters = {
             "item_name": "감자",
             "date_from": "2099-01-01",
@@ -199,30 +184,17 @@ class TestErrorHandling:
 class TestAPIResponseSchema:
     """API 응답 스키마 검증"""
 
-    def test_full_response_creation(self):
-        """전체 응답 생성"""
-        filters_dict = {
-            "item_name": "감자",
-            "variety_name": None,
-            "market_name": "전국도매시장",
-            "date_from": "2018-01-01",
-            "date_to": "2018-12-31",
-            "chart_type": "trend",
-            "metrics": ["price", "volume"],
-            "granularity": "weekly",
-            "top_n_markets": 5,
-            "explain": True,
-            "intent": "normal",
-            "window_days": 30
-        }
+    def test_full_response_creation(self, cached_execute_query, canonical_filter_req):
+        """전체 응답 생성 (기준 FilterRequest 재사용, 재검증 없음)"""
+        filters_dict = canonical_filter_req.model_dump()
 
-        series, _ = execute_query(filters_dict)
+        series, _ = cached_execute_query(filters_dict)
         summary = calculate_summary(series, filters_dict) if series else {}
 
-        # APIResponse 생성
+        # APIResponse 생성 (model_copy는 dict 재검증보다 훨씬 저렴)
         response = APIResponse(
             type="result",
-            filters=FilterRequest(**filters_dict),
+            filters=canonical_filter_req.model_copy(),
             series=series,
             summary=summary,
             narrative="테스트 설명",
@@ -13,25 +13,16 @@ from src.features import (
 class TestCalculatePctChange:
     """백분율 변화 계산 테스트"""
 
-    def test_positive_change(self):
-        """양수 변화"""
-        result = calculate_pct_change(110, 100)
-        assert result == 10.0
-
-    def test_negative_change(self):
-        """음수 변화"""
-        result = calculate_pct_change(90, 100)
-        assert result == -10.0
-
-    def test_zero_previous(self):
-        """이전 값이 0"""
-        result = calculate_pct_change(100, 0)
-        assert result is None
-
-    def test_none_values(self):
-        """None 값"""
-        assert calculate_pct_change(None, 100) is None
-        assert calculate_pct_change(100, None) is None
+    @pytest.mark.parametrize("current,previous,expected", [
+        (110, 100, 10.0),    # 양수 변화
+        (90, 100, -10.0),    # 음수 변화
+        (100, 0, None),      # 이전 값이 0
+        (None, 100, None),   # current가 None
+        (100, None, None),   # previous가 None
+    ])
+    def test_pct_change(self, current, previous, expected):
+        """케이스별 백분율 변화"""
+        assert calculate_pct_change(current, previous) == expected
 
 
 class TestCalculateSummary:
@@ -53,9 +44,8 @@ class TestCalculateSummary:
     def test_wow_calculation(self, sample_series, sample_filters):
         """WoW 계산"""
         summary = calculate_summary(sample_series, sample_filters)
-        # 마지막 두 포인트: 1750 → 1900
-        if summary["wow_price_pct"] is not None:
-            assert summary["wow_price_pct"] > 0  # 상승
+        # 마지막 두 포인트: 1750 → 1900, 주간 8포인트라 항상 계산됨
+        assert summary["wow_price_pct"] == 8.57
 
     def test_compare_markets_aggregation(self):
         """시장 비교 시 집계"""
@@ -76,8 +66,8 @@ class TestDetectAnomalies:
     def test_no_anomalies(self, sample_series):
         """이상치 없음"""
         anomalies = detect_anomalies(sample_series)
-        # 일반적인 데이터에서는 이상치가 없을 수 있음
-        assert isinstance(anomalies, list)
+        # 완만한 상승 시리즈는 기본 임계(2σ)에서 이상치가 나오지 않아야 함
+        assert anomalies == []
 
     def test_with_anomaly(self):
         """이상치가 있는 경우"""
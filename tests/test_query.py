@@ -8,13 +8,13 @@ from src.query import (
     aggregate_by_granularity,
     get_filtered_dataframe
 )
-from src.data_loader import load_data
 
 
+@pytest.mark.slow
 class TestExecuteQuery:
     """execute_query 테스트"""
 
-    def test_trend_query(self):
+    def test_trend_query(self, cached_execute_query):
         """trend 차트 쿼리"""
         filters = {
             "item_name": "감자",
@@ -25,7 +25,7 @@ class TestExecuteQuery:
             "chart_type": "trend",
             "granularity": "weekly"
         }
-        series, warnings = execute_query(filters)
+        series, warnings = cached_execute_query(filters)
         assert isinstance(series, list)
         # 데이터가 있으면 검증
         if series:
@@ -33,7 +33,7 @@ class TestExecuteQuery:
             assert "price" in series[0]
             assert "volume" in series[0]
 
-    def test_compare_markets_query(self):
+    def test_compare_markets_query(self, cached_execute_query):
         """compare_markets 차트 쿼리"""
         filters = {
             "item_name": "감자",
@@ -45,13 +45,13 @@ class TestExecuteQuery:
             "top_n_markets": 3,
             "granularity": "weekly"
         }
-        series, warnings = execute_query(filters)
+        series, warnings = cached_execute_query(filters)
         assert isinstance(series, list)
         # 데이터가 있고 시장 비교면 market_name이 있어야 함
         if series:
             assert "market_name" in series[0]
 
-    def test_volatility_query(self):
+    def test_volatility_query(self, cached_execute_query):
         """volatility 차트 쿼리"""
         filters = {
             "item_name": "감자",
@@ -62,11 +62,11 @@ class TestExecuteQuery:
             "chart_type": "volatility",
             "granularity": "weekly"
         }
-        series, warnings = execute_query(filters)
+        series, warnings = cached_execute_query(filters)
         assert isinstance(series, list)
 
-    def test_empty_result(self):
-        """결과 없음"""
+    def test_empty_result(self, patch_mini_data):
+        """결과 없음 (합성 프레임으로 실데이터 스캔 생략)"""
         filters = {
             "item_name": "존재하지않는품목",
             "variety_name": None,
@@ -80,54 +80,48 @@ class TestExecuteQuery:
         assert series == []
 
 
+@pytest.mark.slow
 class TestApplyFilters:
     """apply_filters 테스트"""
 
-    def test_item_filter(self):
+    def test_item_filter(self, potato_filtered):
         """품목 필터"""
-        df = load_data()
-        filters = {"item_name": "감자"}
-        filtered, warnings = apply_filters(df, filters)
-        if len(filtered) > 0:
-            assert filtered["item_name"].unique()[0] == "감자"
+        if len(potato_filtered) > 0:
+            assert potato_filtered["item_name"].unique()[0] == "감자"
 
-    def test_date_filter(self):
-        """날짜 필터"""
-        df = load_data()
+    def test_date_filter(self, potato_filtered):
+        """날짜 필터 (품목 필터된 프레임에 날짜 조건만 추가 적용)"""
         filters = {
             "item_name": "감자",
             "date_from": "2018-01-01",
             "date_to": "2018-06-30"
         }
-        filtered, warnings = apply_filters(df, filters)
+        filtered, warnings = apply_filters(potato_filtered, filters)
         if len(filtered) > 0:
             assert filtered["date"].min().year == 2018
 
 
+@pytest.mark.slow
 class TestAggregation:
     """집계 테스트"""
 
-    def test_weekly_aggregation(self):
+    def test_weekly_aggregation(self, potato_filtered):
         """주간 집계"""
-        df = load_data()
-        filters = {"item_name": "감자"}
-        filtered, _ = apply_filters(df, filters)
-        if len(filtered) > 0:
-            aggregated = aggregate_by_granularity(filtered, "weekly", group_by_market=False)
+        if len(potato_filtered) > 0:
+            aggregated = aggregate_by_granularity(potato_filtered, "weekly", group_by_market=False)
             assert "date" in aggregated.columns
             assert "price_kg" in aggregated.columns
 
-    def test_market_grouping(self):
+    def test_market_grouping(self, potato_filtered):
         """시장별 그룹화"""
-        df = load_data()
-        filters = {"item_name": "감자"}
-        filtered, _ = apply_filters(df, filters)
-        if len(filtered) > 0:
-            aggregated = aggregate_by_granularity(filtered, "weekly", group_by_market=True)
+        if len(potato_filtered) > 0:
+            aggregated = aggregate_by_granularity(potato_filtered, "weekly", group_by_market=True)
             if len(aggregated) > 0:
                 assert "market_name" in aggregated.columns
 
 
+@pytest.mark.slow
+@pytest.mark.usefixtures("require_data")
 class TestIntentQueries:
     """intent별 쿼리 테스트"""
 
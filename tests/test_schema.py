@@ -3,6 +3,9 @@
 """
 import pytest
 from pydantic import ValidationError
+
+# 이 모듈은 전부 순수 pydantic 검증 (데이터 로드/쿼리 없음)
+pytestmark = pytest.mark.schema_only
 from src.schema import (
     FilterRequest, APIResponse, SummaryStats, SeriesPoint,
     NLUFiltersOutput, NLUClarifyOutput, ClarifyQuestion